@@ -1,19 +1,148 @@
+import gzip
+import hashlib
+import io
 import json
 import os
+import tempfile
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+CACHEABLE_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+STATUS_LABELS = ('PASS', 'FAIL')
+PREVIEW_LIMIT = 600
+# Bodies up to this size are read to the end after the preview so their
+# keep-alive socket goes back to the pool; larger ones close the connection.
+DRAIN_LIMIT = 64 * 1024
+BATCH_PATH = '/batch'
+BATCH_SIZE = 50
+# Column order of _prepare() output, matching _run_one's positional arguments.
+CASE_COLUMNS = ('test_ids', 'names', 'methods', 'urls', 'headers', 'payloads', 'params', 'expected', 'templates')
+REPORTS_DIR = 'reports'
+
+os.makedirs(REPORTS_DIR, exist_ok=True)
+
+# mkstemp creates 0600 files; reports get the mode a plain open() would give them.
+_umask = os.umask(0)
+os.umask(_umask)
+REPORT_FILE_MODE = 0o666 & ~_umask
+
+# Report files are written off the request path; a single worker keeps writes ordered.
+_report_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='api-report-writer')
+# Writes still in flight, by report file name, so a download can wait for them.
+_pending_reports: Dict[str, Future] = {}
+_pending_lock = threading.Lock()
+
+
+def _write_report(report_path: str, payload: Dict[str, Any]):
+    """Write the gzipped report next to its final path and swap it in once complete,
+    so a download never sees a half-written archive."""
+    fd, tmp_path = tempfile.mkstemp(prefix='.api_report_', suffix='.tmp', dir=os.path.dirname(report_path) or '.')
+    try:
+        # Level 1 is the fastest gzip setting and still shrinks JSON several-fold.
+        with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(
+                filename=os.path.basename(report_path), mode='wb', compresslevel=1, fileobj=raw) as handle:
+            if orjson is not None:
+                handle.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                text = io.TextIOWrapper(handle, encoding='utf-8')
+                json.dump(payload, text, indent=2, ensure_ascii=False)
+                text.detach()
+        os.chmod(tmp_path, REPORT_FILE_MODE)
+        os.replace(tmp_path, report_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _report_written(report_file: str, report_path: str, future):
+    with _pending_lock:
+        if _pending_reports.get(report_file) is future:
+            del _pending_reports[report_file]
+    exc = future.exception()
+    if exc is not None:
+        print(f"[ERROR] Failed to write API execution report {report_path}: {exc}")
+
+
+def wait_for_report(report_file: str, timeout: Optional[float] = 30) -> bool:
+    """Block until a report returned by save_execution_report is on disk.
+
+    Returns False if the write failed or is still running after ``timeout``;
+    names with no pending write return True straight away.
+    """
+    with _pending_lock:
+        future = _pending_reports.get(report_file)
+    if future is None:
+        return True
+    try:
+        future.result(timeout=timeout)
+    except Exception:
+        return False
+    return True
+
+
+def build_adapter(pool_size: int = 32) -> HTTPAdapter:
+    """Create a connection pool capped at ``pool_size`` sockets per host.
+
+    ``pool_block`` makes extra concurrent requests wait for a pooled socket
+    instead of opening throwaway connections that pay a fresh handshake.
+    """
+    return HTTPAdapter(pool_connections=32, pool_maxsize=pool_size, pool_block=True, max_retries=Retry(total=0))
+
+
+def build_session(pool_size: int = 32, adapter: Optional[HTTPAdapter] = None) -> requests.Session:
+    """Create a keep-alive session, optionally over an existing adapter's pool.
+
+    Sessions sharing an adapter share sockets but keep separate cookie jars.
+    """
+    session = requests.Session()
+    if adapter is None:
+        adapter = build_adapter(pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
 
 
 class ApiTestExecutor:
     """Executes API test cases and captures rich diagnostics."""
 
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, max_workers: int = 32, cache_enabled: bool = False, cache_ttl: float = 60.0,
+                 session: Optional[requests.Session] = None):
         if not base_url:
             raise ValueError("API base URL is required")
         self.base_url = base_url.rstrip('/')
+        self.max_workers = max(1, max_workers)
+        # A caller-supplied session is shared (and closed) by its owner.
+        self._owns_session = session is None
+        # One pooled socket per worker so concurrent cases never wait on a connection.
+        self.session = session if session is not None else build_session(self.max_workers)
+        # Opt-in: identical reads within one execute_tests() call share a response.
+        self.cache_enabled = cache_enabled
+        self.cache_ttl = cache_ttl
+        # key -> (stored_at, status_code, response_preview)
+        self._cache: Dict[str, Tuple[float, int, str]] = {}
+        # key -> Future of the request one worker is making for every duplicate
+        self._inflight: Dict[str, Future] = {}
+        self._cache_lock = threading.Lock()
+        # Paths under these prefixes are written by the current suite and never cached.
+        self._mutated_prefixes: Tuple[str, ...] = ()
+        self._batch_supported: Optional[bool] = None
         self.results: List[Dict[str, Any]] = []
         self.summary = {
             'total': 0,
@@ -22,102 +151,385 @@ class ApiTestExecutor:
             'execution_time': 0
         }
 
-    def execute_tests(self, test_cases: List[Dict[str, Any]]) -> Dict[str, Any]:
-        start_suite = time.time()
-        self.results = []
-        self.summary['total'] = len(test_cases)
-        self.summary['passed'] = 0
-        self.summary['failed'] = 0
+    def execute_tests(self, test_cases: List[Dict[str, Any]], batching: bool = False) -> Dict[str, Any]:
+        """Run every case and return the summary plus per-case results.
+
+        With ``batching`` enabled and a ``/batch`` endpoint on the API, cases
+        against the base URL are sent in bulk; anything the batch endpoint
+        does not answer is executed individually.
+        """
+        start_suite = time.perf_counter_ns()
+        total = len(test_cases)
+        results: List[Optional[Dict[str, Any]]] = [None] * total
 
+        with self._cache_lock:
+            self._cache.clear()
+
+        if total:
+            cases = self._prepare(test_cases)
+            if self.cache_enabled:
+                # Cases run concurrently, so a read can't be ordered against a write in
+                # the same suite; reads under any written path always hit the API.
+                self._mutated_prefixes = tuple({
+                    urlsplit(url).path.rstrip('/')
+                    for method, url in zip(cases['methods'], cases['urls'])
+                    if method not in CACHEABLE_METHODS
+                })
+            pending = range(total)
+            if batching and self._supports_batching():
+                for index, result in self._run_batched(cases).items():
+                    results[index] = result
+                pending = [index for index in pending if results[index] is None]
+
+            if pending:
+                # Cases are independent and I/O-bound, so run them concurrently;
+                # map() keeps the results in submission order.
+                columns = [[cases[column][index] for index in pending] for column in CASE_COLUMNS]
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as pool:
+                    for index, result in zip(pending, pool.map(self._run_one, *columns)):
+                        results[index] = result
+
+        # Tally in locals after collection so workers never touch shared state.
+        counters = [0, 0]
+        for result in results:
+            counters[result['status'] != 'PASS'] += 1
+
+        self.results = results
+        self.summary['total'] = total
+        self.summary['passed'] = counters[0]
+        self.summary['failed'] = counters[1]
+        self.summary['execution_time'] = (time.perf_counter_ns() - start_suite) // 10_000_000 / 100
+        return {
+            'summary': self.summary,
+            'tests': self.results
+        }
+
+    def _prepare(self, test_cases: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """Normalise every case once into parallel column lists."""
+        prepared: Dict[str, List[Any]] = {
+            'test_ids': [], 'names': [], 'methods': [], 'urls': [],
+            'headers': [], 'payloads': [], 'params': [], 'expected': [], 'templates': [],
+        }
+        # Cases sharing method, URL, headers and params share one prepared
+        # request, so URL parsing and header merging happen once per group.
+        templates: Dict[tuple, Optional[Tuple[requests.PreparedRequest, Dict[str, Any]]]] = {}
         for case in test_cases:
-            start = time.time()
-            url = case.get('url') or self._build_url(case.get('path', ''))
+            payload = case.get('payload')
             method = (case.get('method') or 'GET').upper()
+            url = case.get('url') or self._build_url(case.get('path', ''))
             headers = case.get('headers') or {}
-            payload = case.get('payload')
             params = case.get('query') or {}
-            expected_status = int(case.get('expected_status', 200))
-
-            result = {
-                'test_id': case.get('test_id'),
-                'name': case.get('name'),
-                'method': method,
-                'url': url,
-                'expected_status': expected_status,
-                'status': 'SKIPPED',
-                'status_code': None,
-                'response_time': 0,
-                'response_preview': '',
-                'error': ''
-            }
 
-            try:
-                response = requests.request(
-                    method=method,
-                    url=url,
-                    headers=headers,
-                    json=payload if payload not in [None, ''] else None,
-                    params=params,
-                    timeout=30
-                )
-                duration = round(time.time() - start, 3)
-                result['response_time'] = duration
-                result['status_code'] = response.status_code
-                result['response_preview'] = self._truncate(response.text)
-
-                if response.status_code == expected_status:
-                    result['status'] = 'PASS'
-                    self.summary['passed'] += 1
+            group = self._template_key(method, url, headers, params)
+            if group is None:
+                template = None
+            elif group in templates:
+                template = templates[group]
+            else:
+                try:
+                    request = requests.Request(method, url, headers=headers, params=params)
+                    base_request = self.session.prepare_request(request)
+                    # Cookies are attached per send from the live jar, so ones set
+                    # by earlier responses in the suite are not frozen out.
+                    base_request.headers.pop('Cookie', None)
+                    template = (
+                        base_request,
+                        self.session.merge_environment_settings(url, {}, True, None, None),
+                    )
+                except (requests.RequestException, ValueError):
+                    # Leave it to _run_one so the error is reported on the case.
+                    template = None
+                templates[group] = template
+
+            prepared['test_ids'].append(case.get('test_id'))
+            prepared['names'].append(case.get('name'))
+            prepared['methods'].append(method)
+            prepared['urls'].append(url)
+            prepared['headers'].append(headers)
+            prepared['payloads'].append(payload if payload not in [None, ''] else None)
+            prepared['params'].append(params)
+            prepared['expected'].append(int(case.get('expected_status', 200)))
+            prepared['templates'].append(template)
+        return prepared
+
+    @staticmethod
+    def _template_key(method: str, url: str, headers: Any, params: Any) -> Optional[tuple]:
+        """Hashable template group for a case, or None if it should not be templated.
+
+        Cases setting their own Cookie header, or with headers/params that can't
+        be hashed (e.g. list values), go through session.request() unchanged.
+        """
+        try:
+            if any(str(name).lower() == 'cookie' for name in headers):
+                return None
+            key = (method, url, tuple(sorted(headers.items())), tuple(sorted(params.items())))
+            hash(key)
+        except (AttributeError, TypeError):
+            return None
+        return key
+
+    def _run_one(self, test_id: Any, name: Any, method: str, url: str, headers: Dict[str, Any],
+                 payload: Any, params: Dict[str, Any], expected_status: int,
+                 template: Optional[Tuple[requests.PreparedRequest, Dict[str, Any]]]) -> Dict[str, Any]:
+        start = time.perf_counter_ns()
+        result = self._new_result(test_id, name, method, url, expected_status)
+        cache_key = None
+        owns_fetch = False
+
+        try:
+            cached = None
+            if (self.cache_enabled and method in CACHEABLE_METHODS
+                    and not urlsplit(url).path.startswith(self._mutated_prefixes)):
+                cache_key = self._cache_key(method, url, params, headers, payload)
+                cached, pending = self._cache_claim(cache_key)
+                if pending is not None:
+                    # A duplicate is already on the wire; share its response, or
+                    # fetch uncached if that request failed.
+                    cached = pending.result()
+                    cache_key = None
+                owns_fetch = cache_key is not None and cached is None
+
+            if cached:
+                status_code, preview = cached
+                result['cached'] = True
+            else:
+                if template is None:
+                    response = self.session.request(
+                        method=method,
+                        url=url,
+                        headers=headers,
+                        json=payload,
+                        params=params,
+                        timeout=30,
+                        stream=True
+                    )
                 else:
-                    result['status'] = 'FAIL'
-                    result['error'] = f'Expected {expected_status} but received {response.status_code}'
-                    self.summary['failed'] += 1
-            except Exception as exc:
-                result['status'] = 'FAIL'
-                result['error'] = str(exc)
-                result['response_time'] = round(time.time() - start, 3)
-                self.summary['failed'] += 1
-
-            self.results.append(result)
-
-        self.summary['execution_time'] = round(time.time() - start_suite, 2)
+                    base_request, send_settings = template
+                    prepared = base_request.copy()
+                    prepared.prepare_cookies(self.session.cookies)
+                    prepared.prepare_body(data=None, files=None, json=payload)
+                    response = self.session.send(prepared, timeout=30, **send_settings)
+                status_code = response.status_code
+                head = self._read_preview(response)
+                # Use the charset from Content-Type; never run chardet detection.
+                preview = self._truncate_bytes(head, encoding=response.encoding or 'utf-8')
+                if owns_fetch:
+                    self._cache_put(cache_key, status_code, preview)
+                    owns_fetch = False
+
+            self._record_response(result, status_code, preview, self._elapsed_seconds(start))
+        except Exception as exc:
+            if owns_fetch:
+                self._cache_abandon(cache_key)
+            result['status'] = 'FAIL'
+            result['error'] = str(exc)
+            result['response_time'] = self._elapsed_seconds(start)
+
+        return result
+
+    @staticmethod
+    def _new_result(test_id: Any, name: Any, method: str, url: str, expected_status: int) -> Dict[str, Any]:
         return {
-            'summary': self.summary,
-            'tests': self.results
+            'test_id': test_id,
+            'name': name,
+            'method': method,
+            'url': url,
+            'expected_status': expected_status,
+            'status': 'SKIPPED',
+            'status_code': None,
+            'response_time': 0,
+            'response_preview': '',
+            'error': ''
         }
 
+    @staticmethod
+    def _record_response(result: Dict[str, Any], status_code: int, preview: str, response_time: float):
+        expected_status = result['expected_status']
+        result['response_time'] = response_time
+        result['status_code'] = status_code
+        result['response_preview'] = preview
+
+        failed = int(status_code != expected_status)
+        result['status'] = STATUS_LABELS[failed]
+        if failed:
+            result['error'] = f'Expected {expected_status} but received {status_code}'
+
+    def _supports_batching(self) -> bool:
+        """Probe the batch endpoint once per executor."""
+        if self._batch_supported is None:
+            try:
+                response = self.session.options(f"{self.base_url}{BATCH_PATH}", timeout=5)
+                response.close()
+                self._batch_supported = response.status_code < 400
+            except requests.RequestException:
+                self._batch_supported = False
+        return self._batch_supported
+
+    def _run_batched(self, cases: Dict[str, List[Any]]) -> Dict[int, Dict[str, Any]]:
+        """Send cases targeting the base URL through the batch endpoint.
+
+        The request body is a list of ``{"id", "method", "path", "query",
+        "headers", "payload"}`` objects and the endpoint must reply with a list
+        of ``{"id", "status", "body"}`` objects. Returns results keyed by case
+        index; cases missing from the reply are left for individual execution.
+        """
+        prefix = self.base_url
+        indices = [index for index, url in enumerate(cases['urls']) if url.startswith(prefix)]
+        batch_url = f"{prefix}{BATCH_PATH}"
+        results: Dict[int, Dict[str, Any]] = {}
+
+        for offset in range(0, len(indices), BATCH_SIZE):
+            chunk = indices[offset:offset + BATCH_SIZE]
+            envelope = [
+                {
+                    'id': index,
+                    'method': cases['methods'][index],
+                    'path': cases['urls'][index][len(prefix):] or '/',
+                    'query': cases['params'][index],
+                    'headers': cases['headers'][index],
+                    'payload': cases['payloads'][index],
+                }
+                for index in chunk
+            ]
+            start = time.perf_counter_ns()
+            try:
+                response = self.session.post(batch_url, json=envelope, timeout=30)
+                replies = response.json() if response.ok else None
+            except (requests.RequestException, ValueError):
+                replies = None
+            if not isinstance(replies, list):
+                continue
+
+            response_time = self._elapsed_seconds(start)
+            wanted = set(chunk)
+            for reply in replies:
+                if not isinstance(reply, dict):
+                    continue
+                index = reply.get('id')
+                status_code = reply.get('status')
+                # Ids echo our integer indices; anything else (lists, objects, bools)
+                # is an unmatched reply and its case runs individually.
+                if type(index) is not int or index not in wanted or not isinstance(status_code, int):
+                    continue
+                body = reply.get('body')
+                raw = body if isinstance(body, str) else json.dumps(body, default=str)
+                result = self._new_result(
+                    cases['test_ids'][index], cases['names'][index], cases['methods'][index],
+                    cases['urls'][index], cases['expected'][index],
+                )
+                result['batched'] = True
+                self._record_response(result, status_code, self._truncate_bytes(raw.encode('utf-8')), response_time)
+                results[index] = result
+                wanted.discard(index)
+
+        return results
+
     def save_execution_report(self) -> str:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_file = f"api_execution_report_{timestamp}.json"
-        report_path = os.path.join('reports', report_file)
-        os.makedirs('reports', exist_ok=True)
+        report_file = f"api_execution_report_{timestamp}.json.gz"
+        report_path = os.path.join(REPORTS_DIR, report_file)
 
+        # Snapshot the summary/results so a later run on this executor can't
+        # change what lands on disk.
         payload = {
             'base_url': self.base_url,
             'executed_at': datetime.utcnow().isoformat(),
-            'summary': self.summary,
-            'results': self.results
+            'summary': dict(self.summary),
+            'results': list(self.results)
         }
-
-        with open(report_path, 'w', encoding='utf-8') as handle:
-            json.dump(payload, handle, indent=2, ensure_ascii=False)
+        with _pending_lock:
+            future = _report_writer.submit(_write_report, report_path, payload)
+            _pending_reports[report_file] = future
+        future.add_done_callback(lambda done: _report_written(report_file, report_path, done))
 
         return report_file
 
-    def _build_url(self, path: str) -> str:
-        normalized = path if path.startswith('/') else f'/{path}'
-        return f"{self.base_url}{normalized}"
+    def close(self):
+        """Release pooled connections held by the HTTP session."""
+        if self._owns_session:
+            self.session.close()
 
     @staticmethod
-    def _truncate(body: str, limit: int = 600) -> str:
-        if body is None:
-            return ''
-        if len(body) <= limit:
-            return body
-        return body[:limit] + '...'
+    def _read_preview(response: requests.Response) -> bytes:
+        """Return the first PREVIEW_LIMIT + 1 body bytes and release the response.
+
+        The rest of a bounded body is drained so urllib3 returns the socket to the
+        pool; closing mid-body would throw the keep-alive connection away.
+        """
+        try:
+            chunks = response.iter_content(PREVIEW_LIMIT + 1)
+            head = next(chunks, b'')
+            try:
+                declared = int(response.headers.get('Content-Length', 0))
+            except ValueError:
+                declared = 0
+            if declared <= DRAIN_LIMIT:
+                drained = len(head)
+                for chunk in chunks:
+                    drained += len(chunk)
+                    if drained > DRAIN_LIMIT:
+                        break
+            return head
+        finally:
+            response.close()
 
+    @staticmethod
+    def _elapsed_seconds(start_ns: int) -> float:
+        """Seconds since ``start_ns`` at millisecond resolution."""
+        return (time.perf_counter_ns() - start_ns) // 1_000_000 / 1000
+
+    @staticmethod
+    def _cache_key(method: str, url: str, params: Dict[str, Any], headers: Dict[str, Any], payload: Any) -> str:
+        raw = json.dumps([method, url, params, headers, payload], sort_keys=True, default=str)
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
 
+    def _cache_claim(self, key: str) -> Tuple[Optional[Tuple[int, str]], Optional[Future]]:
+        """Return ``(cached, pending)`` for a cacheable read.
 
+        ``cached`` is a fresh stored response; ``pending`` is the Future of a
+        duplicate request another worker is already making. With neither, the
+        caller owns the fetch and must finish it with _cache_put or _cache_abandon.
+        """
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                stored_at, status_code, preview = entry
+                if time.time() - stored_at <= self.cache_ttl:
+                    return (status_code, preview), None
+                del self._cache[key]
+            pending = self._inflight.get(key)
+            if pending is not None:
+                return None, pending
+            self._inflight[key] = Future()
+            return None, None
 
+    def _cache_put(self, key: str, status_code: int, preview: str):
+        with self._cache_lock:
+            self._cache[key] = (time.time(), status_code, preview)
+            pending = self._inflight.pop(key, None)
+        if pending is not None:
+            pending.set_result((status_code, preview))
 
+    def _cache_abandon(self, key: str):
+        """Release duplicates waiting on a fetch that failed."""
+        with self._cache_lock:
+            pending = self._inflight.pop(key, None)
+        if pending is not None:
+            pending.set_result(None)
+
+    def _build_url(self, path: str) -> str:
+        normalized = path if path.startswith('/') else f'/{path}'
+        return f"{self.base_url}{normalized}"
 
+    @staticmethod
+    def _truncate_bytes(body: bytes, limit: int = PREVIEW_LIMIT, encoding: str = 'utf-8') -> str:
+        """Decode only the preview slice instead of the whole response body."""
+        if not body:
+            return ''
+        try:
+            text = body[:limit].decode(encoding, errors='replace')
+        except LookupError:
+            text = body[:limit].decode('utf-8', errors='replace')
+        if len(body) <= limit:
+            return text
+        return text + '...'
@@ -1,16 +1,56 @@
 from flask import Flask, render_template, request, jsonify, send_file
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import atexit
+import gzip
 import json
 import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
-from smart_test_engine import SmartTestEngine
-from test_executor import TestExecutor
-from recording_manager import RecordingSession, RecordingManager
-from smart_api_engine import SmartApiEngine
-from api_test_executor import ApiTestExecutor
+# Engines and executors are imported inside the routes that use them, so the
+# app starts without loading Playwright until a browser endpoint is hit.
+from recording_manager import RecordingManager
 from report_history import add_entry as log_history_entry, get_history as get_history_entries
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that encodes and decodes with orjson when it is installed."""
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        # response() always passes compact separators (orjson's only output) or,
+        # in debug mode, indent=2; anything else goes through the default encoder.
+        options = dict(kwargs)
+        separators = options.pop('separators', None)
+        indent = options.pop('indent', None)
+        if options or indent not in (None, 2) or separators not in (None, (',', ':')):
+            return super().dumps(obj, **kwargs)
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 recording_manager = RecordingManager()
 
@@ -19,6 +59,15 @@ app.config['UPLOAD_FOLDER'] = 'reports'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['JSONIFY_PRETTYPRINT_REGULAR'] = False  # Disable pretty printing for smaller responses
 
+MAX_API_WORKERS = 128
+API_SESSION_CACHE_SIZE = 8
+
+# Warm connection pools per API base URL, so repeated suites reuse open sockets.
+# Each entry is {'adapter', 'leases', 'retired'}; a retired pool is closed once
+# its last lease is returned.
+_api_pools = OrderedDict()
+_api_pools_lock = threading.Lock()
+
 # Ensure directories exist
 os.makedirs('reports', exist_ok=True)
 os.makedirs('screenshots', exist_ok=True)
@@ -48,6 +97,73 @@ def handle_exception(e):
         'status': 500
     }), 500
 
+def summarize_test_cases(test_cases):
+    """Build the generation summary from a single pass over the categories."""
+    counts = {category: len(tests) for category, tests in test_cases.items()}
+    return {
+        'total_tests': sum(counts.values()),
+        'positive': counts.get('positive', 0),
+        'negative': counts.get('negative', 0),
+        'ui': counts.get('ui', 0),
+        'functional': counts.get('functional', 0)
+    }
+
+def _retire_api_pool(pool):
+    """Mark a pool as dropped from the cache; return True if nobody holds it."""
+    pool['retired'] = True
+    return pool['leases'] == 0
+
+@contextmanager
+def lease_api_session(base_url):
+    """Yield a fresh session for one suite run over the pooled sockets for base_url.
+
+    Every run gets its own cookie jar, so cookies set during one suite are never
+    sent by the next. The least recently used pool is evicted past the cache size.
+    """
+    from api_test_executor import build_adapter, build_session
+
+    key = base_url.rstrip('/')
+    idle = []
+    with _api_pools_lock:
+        pool = _api_pools.get(key)
+        if pool is not None:
+            _api_pools.move_to_end(key)
+        else:
+            pool = {'adapter': build_adapter(MAX_API_WORKERS), 'leases': 0, 'retired': False}
+            _api_pools[key] = pool
+            while len(_api_pools) > API_SESSION_CACHE_SIZE:
+                _, evicted = _api_pools.popitem(last=False)
+                if _retire_api_pool(evicted):
+                    idle.append(evicted)
+        pool['leases'] += 1
+    for evicted in idle:
+        evicted['adapter'].close()
+
+    try:
+        # Not closed here: Session.close() would close the shared adapter.
+        yield build_session(adapter=pool['adapter'])
+    finally:
+        with _api_pools_lock:
+            pool['leases'] -= 1
+            release = pool['retired'] and pool['leases'] == 0
+        if release:
+            pool['adapter'].close()
+
+def close_api_sessions():
+    """Drop every pooled API connection; pools still in use close when their run ends."""
+    with _api_pools_lock:
+        count = len(_api_pools)
+        idle = []
+        while _api_pools:
+            _, pool = _api_pools.popitem()
+            if _retire_api_pool(pool):
+                idle.append(pool)
+    for pool in idle:
+        pool['adapter'].close()
+    return count
+
+atexit.register(close_api_sessions)
+
 @app.route('/')
 def index():
     """Main dashboard page"""
@@ -56,6 +172,8 @@ def index():
 @app.route('/api/generate-tests', methods=['POST'])
 def generate_tests():
     """API endpoint to generate test cases"""
+    from smart_test_engine import SmartTestEngine
+
     engine = None
     try:
         data = request.json
@@ -66,6 +184,8 @@ def generate_tests():
         
         if not website_url:
             return jsonify({'error': 'Website URL is required'}), 400
+        if data.get('refresh'):
+            SmartTestEngine.invalidate_cache(website_url)
         
         # Initialize test engine
         engine = SmartTestEngine(website_url, login_id, password, headed=headed)
@@ -82,13 +202,7 @@ def generate_tests():
             'test_cases': result,
             'report_file': report_file,
             'excel_report_file': excel_report_file,
-            'summary': {
-                'total_tests': sum(len(tests) for tests in result.values()),
-                'positive': len(result.get('positive', [])),
-                'negative': len(result.get('negative', [])),
-                'ui': len(result.get('ui', [])),
-                'functional': len(result.get('functional', []))
-            }
+            'summary': summarize_test_cases(result)
         }
         log_history_entry({
             'type': 'ui_generation',
@@ -107,6 +221,8 @@ def generate_tests():
 @app.route('/api/analyze-website', methods=['POST'])
 def analyze_website():
     """API endpoint to analyze website structure"""
+    from smart_test_engine import SmartTestEngine
+
     engine = None
     try:
         data = request.json
@@ -114,6 +230,8 @@ def analyze_website():
         
         if not website_url:
             return jsonify({'error': 'Website URL is required'}), 400
+        if data.get('refresh'):
+            SmartTestEngine.invalidate_cache(website_url)
         
         engine = SmartTestEngine(website_url, '', '', headed=True)
         engine.initialize_driver()
@@ -133,6 +251,8 @@ def analyze_website():
 @app.route('/api/test-login', methods=['POST'])
 def test_login():
     """API endpoint to test login functionality"""
+    from smart_test_engine import SmartTestEngine
+
     engine = None
     try:
         data = request.json
@@ -143,6 +263,8 @@ def test_login():
         
         if not all([website_url, login_id, password]):
             return jsonify({'error': 'Website URL, Login ID, and Password are required'}), 400
+        if data.get('refresh'):
+            SmartTestEngine.invalidate_cache(website_url)
         
         engine = SmartTestEngine(website_url, login_id, password, headed=headed)
         engine.initialize_driver()
@@ -164,17 +286,58 @@ def test_login():
 def download_report(filename):
     """Download generated test report"""
     try:
+        from api_test_executor import wait_for_report
+
+        # API execution reports are written in the background; don't 404 a
+        # download that arrives before the write has finished.
+        wait_for_report(filename)
         report_path = os.path.join('reports', filename)
-        if os.path.exists(report_path):
-            return send_file(report_path, as_attachment=True)
-        else:
+        if not os.path.exists(report_path):
             return jsonify({'error': 'Report not found'}), 404
+
+        if filename.endswith('.gz'):
+            download_name = filename[:-3]
+            if 'gzip' not in request.accept_encodings:
+                return send_file(
+                    gzip.open(report_path, 'rb'),
+                    as_attachment=True,
+                    download_name=download_name,
+                    mimetype='application/json',
+                    max_age=0
+                )
+            # Serve the compressed bytes as-is and let the client inflate them.
+            response = send_file(
+                report_path,
+                as_attachment=True,
+                download_name=download_name,
+                mimetype='application/json',
+                conditional=True,
+                etag=True,
+                last_modified=os.path.getmtime(report_path),
+                max_age=0
+            )
+            response.headers['Content-Encoding'] = 'gzip'
+            response.vary.add('Accept-Encoding')
+            return response
+
+        # Conditional GET lets repeat downloads return 304; the WSGI
+        # server's file_wrapper streams fresh downloads with sendfile().
+        return send_file(
+            report_path,
+            as_attachment=True,
+            conditional=True,
+            etag=True,
+            last_modified=os.path.getmtime(report_path),
+            max_age=0
+        )
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/execute-tests', methods=['POST'])
 def execute_tests():
     """API endpoint to execute test cases"""
+    from test_executor import TestExecutor
+
     executor = None
     try:
         data = request.json
@@ -225,6 +388,9 @@ def execute_tests():
 @app.route('/api/generate-and-execute', methods=['POST'])
 def generate_and_execute():
     """API endpoint to generate and execute test cases"""
+    from smart_test_engine import SmartTestEngine
+    from test_executor import TestExecutor
+
     engine = None
     executor = None
     try:
@@ -236,19 +402,15 @@ def generate_and_execute():
         
         if not website_url:
             return jsonify({'error': 'Website URL is required'}), 400
+        if data.get('refresh'):
+            SmartTestEngine.invalidate_cache(website_url)
         
         # Step 1: Generate test cases
         engine = SmartTestEngine(website_url, login_id, password, headed=headed)
         test_cases = engine.generate_all_tests()
         generation_report = engine.save_report()
         generation_excel_report = engine.save_test_cases_excel()
-        generation_summary = {
-            'total_tests': sum(len(tests) for tests in test_cases.values()),
-            'positive': len(test_cases.get('positive', [])),
-            'negative': len(test_cases.get('negative', [])),
-            'ui': len(test_cases.get('ui', [])),
-            'functional': len(test_cases.get('functional', []))
-        }
+        generation_summary = summarize_test_cases(test_cases)
         log_history_entry({
             'type': 'ui_generation',
             'website_url': website_url,
@@ -301,6 +463,8 @@ def generate_and_execute():
 @app.route('/api/api-tests/generate', methods=['POST'])
 def generate_api_tests():
     """Generate API tests from an OpenAPI specification."""
+    from smart_api_engine import SmartApiEngine
+
     try:
         data = request.json or {}
         base_url = data.get('base_url', '').strip()
@@ -335,6 +499,9 @@ def generate_api_tests():
 @app.route('/api/api-tests/execute', methods=['POST'])
 def execute_api_tests():
     """Execute generated API test cases."""
+    from api_test_executor import ApiTestExecutor
+
+    executor = None
     try:
         data = request.json or {}
         base_url = data.get('base_url', '').strip()
@@ -345,8 +512,21 @@ def execute_api_tests():
         if not test_cases:
             return jsonify({'error': 'API test cases are required'}), 400
 
-        executor = ApiTestExecutor(base_url)
-        execution_results = executor.execute_tests(test_cases)
+        max_workers = data.get('max_workers')
+        if max_workers is None:
+            max_workers = 32
+        elif isinstance(max_workers, bool) or (isinstance(max_workers, float) and not max_workers.is_integer()):
+            return jsonify({'error': 'max_workers must be a whole number'}), 400
+        else:
+            try:
+                max_workers = int(max_workers)
+            except (TypeError, ValueError, OverflowError):
+                return jsonify({'error': 'max_workers must be a whole number'}), 400
+        max_workers = min(max(max_workers, 1), MAX_API_WORKERS)
+
+        with lease_api_session(base_url) as session:
+            executor = ApiTestExecutor(base_url, max_workers=max_workers, session=session)
+            execution_results = executor.execute_tests(test_cases, batching=bool(data.get('batching', False)))
         report_file = executor.save_execution_report()
 
         response_payload = {
@@ -363,6 +543,21 @@ def execute_api_tests():
         return jsonify(response_payload)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+    finally:
+        if executor:
+            executor.close()
+
+@app.route('/api/api-tests/reset-pool', methods=['POST'])
+def reset_api_pool():
+    """Drop all pooled API connections."""
+    try:
+        closed = close_api_sessions()
+        return jsonify({
+            'success': True,
+            'closed_sessions': closed
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 @app.route('/api/run-history', methods=['GET'])
 def get_run_history():
@@ -473,4 +668,5 @@ def recording_status():
 
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Development entry point; use wsgi.py with gunicorn for concurrent serving.
+    app.run(host='0.0.0.0', port=5000, threaded=True)
@@ -1,35 +1,260 @@
+import textwrap
 import threading
 import time
+from collections import deque
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from smart_test_engine import SmartTestEngine
+
+# Browser event types that map straight onto a recorded action.
+_ACTION_MAP = {
+    "click": "click",
+    "input": "type",
+    "change": "type",
+    "submit": "submit",
+    "focus": "focus",
+}
+
+# Installed as an init script so the listeners survive full page loads.
+_RECORDER_JS = textwrap.dedent("""
+    (function() {
+        if (window.__mobiliseRecorderInitialized) {
+            return;
+        }
+        window.__mobiliseRecorderInitialized = true;
+        window.__recordedEvents = [];
 
-from smart_test_engine import SmartTestEngine
+        function getAnchorSelector(element) {
+            // Prefer ID
+            if (element.id) {
+                return '#' + element.id;
+            }
+
+            // Try data-testid or data-test
+            if (element.getAttribute('data-testid')) {
+                return '[data-testid="' + element.getAttribute('data-testid') + '"]';
+            }
+            if (element.getAttribute('data-test')) {
+                return '[data-test="' + element.getAttribute('data-test') + '"]';
+            }
+            return '';
+        }
+
+        function getCssSelector(element) {
+            if (!element) { return ''; }
+            // Repeated events on the same node (focus, click, blur) reuse its selector.
+            if (element.__mob_selector) { return element.__mob_selector; }
+            var selector = buildCssSelector(element);
+            try {
+                // Non-enumerable so the stamp stays invisible to the page's own code.
+                Object.defineProperty(element, '__mob_selector', {value: selector, configurable: true});
+            } catch (err) {}
+            return selector;
+        }
+
+        function buildCssSelector(element) {
+            var anchor = getAnchorSelector(element);
+            if (anchor) {
+                return anchor;
+            }
+
+            // Try name attribute
+            if (element.name) {
+                if (element.tagName.toLowerCase() === 'input' || element.tagName.toLowerCase() === 'select') {
+                    return element.tagName.toLowerCase() + '[name="' + element.name + '"]';
+                }
+            }
+
+            // Try role and accessible name
+            if (element.getAttribute('role')) {
+                var role = element.getAttribute('role');
+                var ariaLabel = element.getAttribute('aria-label');
+                if (ariaLabel) {
+                    return '[role="' + role + '"][aria-label="' + ariaLabel + '"]';
+                }
+            }
+
+            // Build path selector
+            var parts = [];
+            while (element && element.nodeType === 1) {
+                var selector = element.nodeName.toLowerCase();
+                if (element.className) {
+                    var classes = element.className.trim().split(/\\s+/).slice(0, 2);
+                    if (classes.length) {
+                        selector += '.' + classes.join('.');
+                    }
+                }
+                var sibling = element;
+                var nth = 1;
+                while (sibling = sibling.previousElementSibling) {
+                    if (sibling.nodeName === element.nodeName) {
+                        nth++;
+                    }
+                }
+                selector += ':nth-of-type(' + nth + ')';
+                parts.unshift(selector);
+                element = element.parentElement;
+
+                // Stop at body or if we found a good selector
+                if (!element || element.nodeName === 'BODY' || element.nodeName === 'HTML') {
+                    break;
+                }
+                // An ancestor already recorded from an earlier event scopes the rest of the path.
+                if (element.__mob_selector) {
+                    parts.unshift(element.__mob_selector);
+                    break;
+                }
+                // An ancestor with a unique anchor is enough to scope the rest of the path.
+                anchor = getAnchorSelector(element);
+                if (anchor) {
+                    parts.unshift(anchor);
+                    break;
+                }
+            }
+            return parts.join(' > ');
+        }
+
+        var TYPING_DEBOUNCE_MS = 250;
+        var pendingTyping = {};
+        window.__typingTimers = {};
+
+        function flushTyping() {
+            Object.keys(pendingTyping).forEach(function(key) {
+                clearTimeout(window.__typingTimers[key]);
+                window.__recordedEvents.push(pendingTyping[key]);
+            });
+            pendingTyping = {};
+            window.__typingTimers = {};
+        }
+        window.__flushTyping = flushTyping;
+
+        var MAX_TEXT_LENGTH = 200;
+        var MAX_VALUE_LENGTH = 500;
+
+        function recordEvent(event) {
+            try {
+                var target = event.target || event.srcElement;
+                if (!target) { return; }
+                var type = event.type;
+                // Only Enter becomes a step; other keys would just flush pending typing early.
+                if (type === 'keydown' && event.key !== 'Enter') { return; }
+                if (type === 'blur') {
+                    flushTyping();
+                    return;
+                }
+                // Send only the fields the recorder reads for this event type.
+                var data = {
+                    timestamp: Date.now(),
+                    type: type,
+                    selector: getCssSelector(target),
+                    tag: (target.tagName || '').toLowerCase(),
+                    url: window.location.href
+                };
+                if (type === 'input' || type === 'change') {
+                    data.value = String(target.value || '').slice(0, MAX_VALUE_LENGTH);
+                    if (target.checked !== undefined) { data.checked = target.checked; }
+                    if (target.selected !== undefined) { data.selected = target.selected; }
+
+                    // Collapse a typing burst into one event carrying the final value.
+                    var key = data.selector;
+                    clearTimeout(window.__typingTimers[key]);
+                    pendingTyping[key] = data;
+                    window.__typingTimers[key] = setTimeout(function() {
+                        delete window.__typingTimers[key];
+                        if (pendingTyping[key]) {
+                            window.__recordedEvents.push(pendingTyping[key]);
+                            delete pendingTyping[key];
+                        }
+                    }, TYPING_DEBOUNCE_MS);
+                    return;
+                }
+                if (type === 'click') {
+                    data.text = String(target.innerText || target.textContent || '').slice(0, MAX_TEXT_LENGTH);
+                    data.href = target.href || '';
+                    if (target.disabled !== undefined) { data.disabled = target.disabled; }
+                } else if (type === 'keydown') {
+                    data.key = event.key;
+                }
+                // Keep ordering: pending typing happened before this event.
+                flushTyping();
+                window.__recordedEvents.push(data);
+            } catch (err) {
+                console.error('Recorder error', err);
+            }
+        }
+
+        ['click', 'change', 'input', 'submit', 'keydown', 'focus', 'blur'].forEach(function(type) {
+            document.addEventListener(type, function(event) {
+                recordEvent(event);
+            }, true);
+        });
+    })();
+""")
 
 
 class RecordingSession:
     """Represents a manual recording session."""
 
+    _DRAIN_EVENTS_JS = """
+        (flush) => {
+            if (!window.__recordedEvents) { return []; }
+            if (flush && window.__flushTyping) { window.__flushTyping(); }
+            const events = window.__recordedEvents.slice();
+            window.__recordedEvents = [];
+            return events;
+        }
+    """
+    POLL_INTERVAL = 0.5
+    MIN_POLL_INTERVAL = 0.05
+    MAX_POLL_INTERVAL = 1.0
+    # Raw events are only kept for debugging; steps hold what a recording needs.
+    MAX_RAW_EVENTS = 10_000
+
+    _LOCATE = '    element = page.locator("{sel}").first\n'
+    # Script lines emitted for each recorded action.
+    _STEP_TEMPLATES = {
+        "navigate": '    page.goto("{sel}")\n    page.wait_for_load_state(\'networkidle\')\n',
+        "click": _LOCATE + "    element.click()\n",
+        "type": _LOCATE + '    element.fill("{value}")\n',
+        "select": _LOCATE + '    element.select_option("{value}")\n',
+        "check": _LOCATE + "    element.check()\n",
+        "uncheck": _LOCATE + "    element.uncheck()\n",
+        "submit": _LOCATE + "    element.press('Enter')\n",
+        "press_enter": _LOCATE + "    element.press('Enter')\n",
+        "focus": _LOCATE + "    element.focus()\n",
+    }
+
     def __init__(self, website_url: str):
         self.website_url = website_url
-        self.engine: Optional[SmartTestEngine] = None
+        self.engine: Optional["SmartTestEngine"] = None
         self.page = None
         self.started_at = datetime.utcnow()
-        self.events: List[Dict[str, Any]] = []
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=self.MAX_RAW_EVENTS)
         self.steps: List[Dict[str, Any]] = []
         self._stop_event = threading.Event()
         self._thread: Optional[threading.Thread] = None
         self._lock = threading.Lock()
         self._step_counter = 0
+        # Bumped whenever self.steps changes; keys the generated-script cache.
+        self._version = 0
+        self._script_cache: Optional[str] = None
+        self._script_cache_version = -1
+        self._escaped_selectors: Dict[str, str] = {}
         self.screenshots: List[Dict[str, str]] = []  # Store screenshots with step IDs
         self.wait_times: Dict[str, float] = {}  # Track wait times between steps
 
     def start(self):
         """Launch Chrome and begin polling for recorded events."""
+        from smart_test_engine import SmartTestEngine
+
         self.engine = SmartTestEngine(self.website_url, "", "", headed=True)
         self.page = self.engine.initialize_driver()
+        self._inject_recorder()
         self.page.goto(self.website_url, wait_until='domcontentloaded')
         self.page.wait_for_load_state('networkidle')
-        self._inject_recorder()
+        self.page.on("framenavigated", self._on_frame_navigated)
         self._thread = threading.Thread(target=self._poll_events, daemon=True)
         self._thread.start()
 
@@ -41,6 +266,10 @@ class RecordingSession:
         if self.engine:
             self.engine.close()
         script = self.build_python_script()
+        for step in self.steps:
+            last_event_ts = step.get("last_event_ts")
+            if last_event_ts:
+                step["updated_at"] = datetime.utcfromtimestamp(last_event_ts / 1000).isoformat()
         return {
             "steps": self.steps,
             "python_script": script,
@@ -49,148 +278,51 @@ class RecordingSession:
         }
 
     def _inject_recorder(self):
-        """Injects JavaScript listeners into the page to track interactions."""
-        script = """
-            (function() {
-                if (window.__mobiliseRecorderInitialized) {
-                    return;
-                }
-                window.__mobiliseRecorderInitialized = true;
-                window.__recordedEvents = [];
-
-                function getCssSelector(element) {
-                    if (!element) { return ''; }
-                    
-                    // Prefer ID
-                    if (element.id) {
-                        return '#' + element.id;
-                    }
-                    
-                    // Try data-testid or data-test
-                    if (element.getAttribute('data-testid')) {
-                        return '[data-testid="' + element.getAttribute('data-testid') + '"]';
-                    }
-                    if (element.getAttribute('data-test')) {
-                        return '[data-test="' + element.getAttribute('data-test') + '"]';
-                    }
-                    
-                    // Try name attribute
-                    if (element.name) {
-                        if (element.tagName.toLowerCase() === 'input' || element.tagName.toLowerCase() === 'select') {
-                            return element.tagName.toLowerCase() + '[name="' + element.name + '"]';
-                        }
-                    }
-                    
-                    // Try role and accessible name
-                    if (element.getAttribute('role')) {
-                        var role = element.getAttribute('role');
-                        var ariaLabel = element.getAttribute('aria-label');
-                        if (ariaLabel) {
-                            return '[role="' + role + '"][aria-label="' + ariaLabel + '"]';
-                        }
-                    }
-                    
-                    // Build path selector
-                    var parts = [];
-                    while (element && element.nodeType === 1) {
-                        var selector = element.nodeName.toLowerCase();
-                        if (element.className) {
-                            var classes = element.className.trim().split(/\\s+/).slice(0, 2);
-                            if (classes.length) {
-                                selector += '.' + classes.join('.');
-                            }
-                        }
-                        var sibling = element;
-                        var nth = 1;
-                        while (sibling = sibling.previousElementSibling) {
-                            if (sibling.nodeName === element.nodeName) {
-                                nth++;
-                            }
-                        }
-                        selector += ':nth-of-type(' + nth + ')';
-                        parts.unshift(selector);
-                        element = element.parentElement;
-                        
-                        // Stop at body or if we found a good selector
-                        if (!element || element.nodeName === 'BODY' || element.nodeName === 'HTML') {
-                            break;
-                        }
-                    }
-                    return parts.join(' > ');
-                }
-
-                function recordEvent(event) {
-                    try {
-                        var target = event.target || event.srcElement;
-                        if (!target) { return; }
-                        var selector = getCssSelector(target);
-                        var data = {
-                            timestamp: Date.now(),
-                            type: event.type,
-                            selector: selector,
-                            tag: (target.tagName || '').toLowerCase(),
-                            value: target.value || '',
-                            text: target.innerText || target.textContent || '',
-                            key: event.key || '',
-                            url: window.location.href,
-                            href: target.href || '',
-                            checked: target.checked !== undefined ? target.checked : null,
-                            selected: target.selected !== undefined ? target.selected : null,
-                            disabled: target.disabled !== undefined ? target.disabled : null
-                        };
-                        window.__recordedEvents.push(data);
-                    } catch (err) {
-                        console.error('Recorder error', err);
-                    }
-                }
-                
-                // Record navigation events
-                window.addEventListener('popstate', function(event) {
-                    recordEvent({type: 'navigation', target: window, timestamp: Date.now()});
-                });
-                
-                // Record URL changes
-                var lastUrl = window.location.href;
-                setInterval(function() {
-                    if (window.location.href !== lastUrl) {
-                        lastUrl = window.location.href;
-                        recordEvent({
-                            type: 'navigation',
-                            target: window,
-                            timestamp: Date.now(),
-                            url: window.location.href
-                        });
-                    }
-                }, 100);
-
-                ['click', 'change', 'input', 'submit', 'keydown', 'focus', 'blur'].forEach(function(type) {
-                    document.addEventListener(type, function(event) {
-                        recordEvent(event);
-                    }, true);
-                });
-            })();
-        """
-        self.page.evaluate(script)
+        """Registers the recorder so it runs in every document the page loads."""
+        self.engine.context.add_init_script(script=_RECORDER_JS)
+
+    def _on_frame_navigated(self, frame):
+        # Navigations are reported by Playwright, so the page needs no URL-polling timer.
+        if frame != self.page.main_frame:
+            return
+        self._process_events([{
+            "type": "navigation",
+            "timestamp": int(time.time() * 1000),
+            "url": frame.url,
+        }])
 
     def _poll_events(self):
         """Continuously pulls recorded events from the browser."""
+        from playwright.sync_api import Error as PlaywrightError
+
+        # Poll faster while the user is interacting and back off when idle.
+        interval = self.POLL_INTERVAL
         while not self._stop_event.is_set():
             try:
-                events = self.page.evaluate(
-                    """
-                    if (!window.__recordedEvents) { return []; }
-                    const events = window.__recordedEvents.slice();
-                    window.__recordedEvents = [];
-                    return events;
-                    """
-                )
-            except Exception:
-                break
+                events = self.page.evaluate(self._DRAIN_EVENTS_JS, False)
+            except PlaywrightError:
+                if self.page.is_closed():
+                    return
+                # The document was replaced mid-call (navigation); the init script re-arms it.
+                events = None
 
             if events:
                 self._process_events(events)
+                interval = max(self.MIN_POLL_INTERVAL, interval / 2)
+            else:
+                interval = min(self.MAX_POLL_INTERVAL, interval * 1.5)
+
+            # Returns as soon as stop() sets the event instead of sleeping it out.
+            if self._stop_event.wait(interval):
+                break
 
-            time.sleep(0.5)
+        # Final drain, including typing still inside its debounce window.
+        try:
+            events = self.page.evaluate(self._DRAIN_EVENTS_JS, True)
+        except PlaywrightError:
+            return
+        if events:
+            self._process_events(events)
 
     def _process_events(self, events: List[Dict[str, Any]]):
         with self._lock:
@@ -198,42 +330,33 @@ class RecordingSession:
                 step = self._convert_event_to_step(event)
                 if step:
                     self.steps.append(step)
+                    self._version += 1
             self.events.extend(events)
 
     def _convert_event_to_step(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         event_type = event.get("type")
         selector = event.get("selector")
 
-        action = None
         value = event.get("value") or ""
-        
+
         # Handle different event types
-        if event_type == "click":
-            action = "click"
-        elif event_type in {"input", "change"}:
-            action = "type"
-        elif event_type == "submit":
-            action = "submit"
-        elif event_type == "keydown" and event.get("key") == "Enter":
-            action = "press_enter"
-        elif event_type == "navigation":
-            action = "navigate"
-            selector = event.get("url", "")
-        elif event_type == "focus":
-            action = "focus"
-        elif event_type == "change" and event.get("tag") == "select":
-            action = "select"
-        elif event_type == "change" and event.get("tag") in ["input"] and event.get("checked") is not None:
-            action = "check" if event.get("checked") else "uncheck"
-        else:
-            return None
+        action = _ACTION_MAP.get(event_type)
+        if action is None:
+            if event_type == "keydown" and event.get("key") == "Enter":
+                action = "press_enter"
+            elif event_type == "navigation":
+                action = "navigate"
+                selector = event.get("url", "")
+            else:
+                return None
 
         # Merge typing events for the same field
         if action == "type":
             last_step = self.steps[-1] if self.steps else None
             if last_step and last_step["action"] == "type" and last_step["selector"] == selector:
                 last_step["value"] = value
-                last_step["updated_at"] = datetime.utcnow().isoformat()
+                last_step["last_event_ts"] = event.get("timestamp")
+                self._version += 1
                 return None
 
         # Calculate wait time since last step
@@ -266,64 +389,52 @@ class RecordingSession:
         
         return step
 
+    def snapshot_steps(self) -> List[Dict[str, Any]]:
+        """Copy the steps so callers can serialize them while polling continues."""
+        with self._lock:
+            return [dict(step) for step in self.steps]
+
     def build_python_script(self) -> str:
         """Generate a Playwright Python script from recorded steps."""
-        lines = [
-            "from playwright.sync_api import sync_playwright",
-            "",
-            "with sync_playwright() as p:",
-            "    browser = p.chromium.launch(headless=False)",
-            "    context = browser.new_context()",
-            "    page = context.new_page()",
-            f"    page.goto('{self.website_url}')",
-            "",
-        ]
-
-        for step in self.steps:
-            selector = self._escape(step["selector"])
-            value = self._escape(step.get("value", ""))
+        with self._lock:
+            if self._script_cache is None or self._script_cache_version != self._version:
+                self._script_cache = self._render_python_script()
+                self._script_cache_version = self._version
+            return self._script_cache
+
+    def _render_python_script(self) -> str:
+        header = (
+            "from playwright.sync_api import sync_playwright\n"
+            "\n"
+            "with sync_playwright() as p:\n"
+            "    browser = p.chromium.launch(headless=False)\n"
+            "    context = browser.new_context()\n"
+            "    page = context.new_page()\n"
+            f"    page.goto('{self.website_url}')\n"
+            "\n"
+        )
+        templates = self._STEP_TEMPLATES
+        escaped_selectors = self._escaped_selectors
+        out: List[Optional[str]] = [None] * len(self.steps)
+        for index, step in enumerate(self.steps):
+            # Selectors never change once recorded, so escape each one once.
+            selector = escaped_selectors.get(step["step_id"])
+            if selector is None:
+                selector = escaped_selectors[step["step_id"]] = self._escape(step["selector"])
 
             # Add wait if significant wait time detected
             wait_time = step.get("wait_time", 0)
+            wait = ""
             if wait_time > 1.0:
-                lines.append(f"    page.wait_for_timeout({int(wait_time * 1000)})  # Wait {wait_time:.1f}s")
-            
-            if step["action"] == "navigate":
-                lines.append(f"    page.goto(\"{selector}\")")
-                lines.append("    page.wait_for_load_state('networkidle')")
-            elif step["action"] == "click":
-                lines.append(f"    element = page.locator(\"{selector}\").first")
-                lines.append("    element.click()")
-                if wait_time > 0.5:
-                    lines.append("    page.wait_for_load_state('networkidle')")
-            elif step["action"] == "type":
-                lines.append(f"    element = page.locator(\"{selector}\").first")
-                lines.append(f"    element.fill(\"{value}\")")
-            elif step["action"] == "select":
-                lines.append(f"    element = page.locator(\"{selector}\").first")
-                lines.append(f"    element.select_option(\"{value}\")")
-            elif step["action"] == "check":
-                lines.append(f"    element = page.locator(\"{selector}\").first")
-                lines.append("    element.check()")
-            elif step["action"] == "uncheck":
-                lines.append(f"    element = page.locator(\"{selector}\").first")
-                lines.append("    element.uncheck()")
-            elif step["action"] == "submit":
-                lines.append(f"    element = page.locator(\"{selector}\").first")
-                lines.append("    element.press('Enter')")
-            elif step["action"] == "press_enter":
-                lines.append(f"    element = page.locator(\"{selector}\").first")
-                lines.append("    element.press('Enter')")
-            elif step["action"] == "focus":
-                lines.append(f"    element = page.locator(\"{selector}\").first")
-                lines.append("    element.focus()")
-            lines.append("")
-
-        lines.extend([
-            "    browser.close()",
-            ""
-        ])
-        return "\n".join(lines)
+                wait = f"    page.wait_for_timeout({int(wait_time * 1000)})  # Wait {wait_time:.1f}s\n"
+
+            action = step["action"]
+            body = templates.get(action, "").format(sel=selector, value=self._escape(step.get("value", "")))
+            if action == "click" and wait_time > 0.5:
+                body += "    page.wait_for_load_state('networkidle')\n"
+            out[index] = f"{wait}{body}\n"
+
+        return "".join([header, *out, "    browser.close()\n"])
 
     @staticmethod
     def _escape(value: str) -> str:
@@ -359,22 +470,29 @@ class RecordingManager:
             return result
 
     def get_status(self) -> Dict[str, Any]:
+        # Idle polls skip the lock; a session starting concurrently shows up on the next poll.
+        if self._session is None:
+            return self._inactive_status()
         with self._lock:
             if not self._session:
-                return {
-                    "active": False,
-                    "steps": [],
-                    "python_script": "",
-                }
+                return self._inactive_status()
             return {
                 "active": True,
                 "website_url": self._session.website_url,
                 "started_at": self._session.started_at.isoformat(),
-                "steps": self._session.steps,
+                "steps": self._session.snapshot_steps(),
                 "python_script": self._session.build_python_script(),
             }
 
     def is_active(self) -> bool:
         return self._session is not None
 
+    @staticmethod
+    def _inactive_status() -> Dict[str, Any]:
+        return {
+            "active": False,
+            "steps": [],
+            "python_script": "",
+        }
+
 
@@ -1,43 +1,188 @@
 import json
 import os
 import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-HISTORY_FILE = os.path.join('reports', 'run_history.json')
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HISTORY_FILE = os.path.join('reports', 'run_history.jsonl')
+LEGACY_HISTORY_FILE = os.path.join('reports', 'run_history.json')
+LOCK_FILE = os.path.join('reports', 'run_history.lock')
+MAX_ENTRIES = 25
+COMPACT_THRESHOLD = 200
+TAIL_CHUNK_SIZE = 8192
 _lock = threading.Lock()
+_line_count: Optional[int] = None
+_cache: Optional[List[Dict]] = None
+_cache_stamp: Optional[tuple] = None
+
+
+def _dumps_line(entry: Dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(entry, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def _loads(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@contextmanager
+def _file_lock(exclusive: bool):
+    """Hold an flock on the sidecar lock file so other processes see whole writes."""
+    if fcntl is None:
+        yield
+        return
+    with open(LOCK_FILE, 'a') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _replace_file(data: bytes):
+    """Atomically swap in new log contents."""
+    tmp_path = '{}.tmp.{}'.format(HISTORY_FILE, os.getpid())
+    with open(tmp_path, 'wb') as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, HISTORY_FILE)
+
+
+def _file_stamp() -> Optional[tuple]:
+    try:
+        stat = os.stat(HISTORY_FILE)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _migrate_legacy():
+    """Convert the old newest-first JSON list into the append-only log."""
+    if os.path.exists(HISTORY_FILE) or not os.path.exists(LEGACY_HISTORY_FILE):
+        return
+    with _file_lock(exclusive=True):
+        if os.path.exists(HISTORY_FILE) or not os.path.exists(LEGACY_HISTORY_FILE):
+            return
+        try:
+            with open(LEGACY_HISTORY_FILE, 'rb') as handle:
+                history = _loads(handle.read())
+        except OSError as exc:
+            print(f"[WARNING] Could not read run history: {exc}")
+            return
+        except ValueError as exc:
+            history = None
+            print(f"[WARNING] Run history is not valid JSON: {exc}")
+        if not isinstance(history, list):
+            _quarantine(LEGACY_HISTORY_FILE)
+            return
+        _replace_file(b''.join(_dumps_line(entry) for entry in reversed(history[:MAX_ENTRIES])))
+        os.remove(LEGACY_HISTORY_FILE)
 
 
-def _read_history() -> List[Dict]:
-    if not os.path.exists(HISTORY_FILE):
+def _read_tail_lines(limit: int) -> List[bytes]:
+    """Return up to `limit` trailing lines of the history file, oldest first."""
+    if limit <= 0 or not os.path.exists(HISTORY_FILE):
         return []
+    with open(HISTORY_FILE, 'rb') as handle:
+        handle.seek(0, os.SEEK_END)
+        position = handle.tell()
+        data = b''
+        while position > 0 and data.count(b'\n') <= limit:
+            step = min(TAIL_CHUNK_SIZE, position)
+            position -= step
+            handle.seek(position)
+            data = handle.read(step) + data
+    lines = [line for line in data.split(b'\n') if line.strip()]
+    return lines[-limit:]
+
+
+def _quarantine(path: str):
+    """Move an unreadable history file aside so new entries cannot clobber it."""
+    corrupt_path = os.path.join(
+        os.path.dirname(path),
+        'run_history.corrupt.{}.json'.format(datetime.utcnow().strftime('%Y%m%d_%H%M%S')),
+    )
+    os.replace(path, corrupt_path)
+    print(f"[WARNING] Moved unreadable run history to {corrupt_path}")
+
+
+def _read_history(limit: int = MAX_ENTRIES) -> List[Dict]:
     try:
-        with open(HISTORY_FILE, 'r', encoding='utf-8') as handle:
-            return json.load(handle)
-    except Exception:
+        lines = _read_tail_lines(limit)
+    except OSError as exc:
+        print(f"[WARNING] Could not read run history: {exc}")
         return []
+    history = []
+    for line in reversed(lines):
+        try:
+            history.append(_loads(line))
+        except ValueError:
+            print("[WARNING] Skipping unreadable run history line")
+    return history
+
+
+def _cached_history() -> List[Dict]:
+    """Return the newest entries, re-reading the log only when it changed on disk."""
+    global _cache, _cache_stamp
+    stamp = _file_stamp()
+    if _cache is None or stamp != _cache_stamp:
+        _cache = _read_history(MAX_ENTRIES)
+        _cache_stamp = stamp
+    return _cache
+
+
+def _compact():
+    """Rewrite the log keeping only the newest MAX_ENTRIES lines."""
+    global _line_count
+    lines = _read_tail_lines(MAX_ENTRIES)
+    _replace_file(b''.join(line + b'\n' for line in lines))
+    _line_count = len(lines)
 
 
 def add_entry(entry: Dict):
     """Append a new run entry to history."""
+    global _line_count, _cache, _cache_stamp
     os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
     entry.setdefault('timestamp', datetime.utcnow().isoformat())
     with _lock:
-        history = _read_history()
-        history.insert(0, entry)
-        history = history[:25]
-        with open(HISTORY_FILE, 'w', encoding='utf-8') as handle:
-            json.dump(history, handle, indent=2, ensure_ascii=False)
+        _migrate_legacy()
+        with _file_lock(exclusive=True):
+            if _file_stamp() != _cache_stamp:
+                # Another process appended since our last look; recount before compacting.
+                _line_count = None
+            history = _cached_history()
+            if _line_count is None:
+                _line_count = len(_read_tail_lines(COMPACT_THRESHOLD))
+            with open(HISTORY_FILE, 'ab') as handle:
+                handle.write(_dumps_line(entry))
+            _line_count += 1
+            if _line_count > COMPACT_THRESHOLD:
+                _compact()
+            _cache = [entry] + history[:MAX_ENTRIES - 1]
+            _cache_stamp = _file_stamp()
 
 
-def get_history(limit: int = 25) -> List[Dict]:
+def get_history(limit: int = MAX_ENTRIES) -> List[Dict]:
     """Return recent history entries."""
+    limit = max(0, min(limit, MAX_ENTRIES))
     with _lock:
-        history = _read_history()
-    return history[:limit]
-
-
-
-
-
-
+        _migrate_legacy()
+        if _cache is None or _file_stamp() != _cache_stamp:
+            with _file_lock(exclusive=False):
+                _cached_history()
+        return _cache[:limit]
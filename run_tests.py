@@ -9,16 +9,22 @@ import json
 def run_test_generation(website_url, login_id="", password=""):
     """Run test generation for a website"""
     
-    print("=" * 60)
-    print("Mobilise Test Automation Tool - Test Runner")
-    print("=" * 60)
-    print(f"\nWebsite URL: {website_url}")
+    # Output is collected and written in one go rather than line by line.
+    lines = [
+        "=" * 60,
+        "Mobilise Test Automation Tool - Test Runner",
+        "=" * 60,
+        f"\nWebsite URL: {website_url}",
+    ]
     if login_id:
-        print(f"Login ID: {login_id}")
-        print(f"Password: {'*' * len(password)}")
-    print("\n" + "=" * 60)
-    print("Starting test generation...")
-    print("=" * 60 + "\n")
+        lines.append(f"Login ID: {login_id}")
+        lines.append(f"Password: {'*' * len(password)}")
+    lines += [
+        "\n" + "=" * 60,
+        "Starting test generation...",
+        "=" * 60 + "\n",
+    ]
+    print("\n".join(lines), flush=True)
     
     # Initialize test engine
     engine = SmartTestEngine(website_url, login_id, password)
@@ -31,58 +37,60 @@ def run_test_generation(website_url, login_id="", password=""):
         report_file = engine.save_report()
         
         # Display summary
-        print("\n" + "=" * 60)
-        print("TEST GENERATION SUMMARY")
-        print("=" * 60)
-        print(f"\nTotal Test Cases Generated: {sum(len(tests) for tests in test_cases.values())}")
-        print(f"  - Positive Tests: {len(test_cases['positive'])}")
-        print(f"  - Negative Tests: {len(test_cases['negative'])}")
-        print(f"  - UI Tests: {len(test_cases['ui'])}")
-        print(f"  - Functional Tests: {len(test_cases['functional'])}")
-        print(f"\nReport saved to: reports/{report_file}")
+        lines = []
+        lines.append("\n" + "=" * 60)
+        lines.append("TEST GENERATION SUMMARY")
+        lines.append("=" * 60)
+        lines.append(f"\nTotal Test Cases Generated: {sum(len(tests) for tests in test_cases.values())}")
+        lines.append(f"  - Positive Tests: {len(test_cases['positive'])}")
+        lines.append(f"  - Negative Tests: {len(test_cases['negative'])}")
+        lines.append(f"  - UI Tests: {len(test_cases['ui'])}")
+        lines.append(f"  - Functional Tests: {len(test_cases['functional'])}")
+        lines.append(f"\nReport saved to: reports/{report_file}")
         
         # Display sample test cases
-        print("\n" + "=" * 60)
-        print("SAMPLE TEST CASES")
-        print("=" * 60)
+        lines.append("\n" + "=" * 60)
+        lines.append("SAMPLE TEST CASES")
+        lines.append("=" * 60)
         
         # Show first positive test
         if test_cases['positive']:
-            print("\n[POSITIVE TEST]")
+            lines.append("\n[POSITIVE TEST]")
             pos_test = test_cases['positive'][0]
-            print(f"  Test ID: {pos_test['test_id']}")
-            print(f"  Test Name: {pos_test['test_name']}")
-            print(f"  Priority: {pos_test.get('priority', 'N/A')}")
+            lines.append(f"  Test ID: {pos_test['test_id']}")
+            lines.append(f"  Test Name: {pos_test['test_name']}")
+            lines.append(f"  Priority: {pos_test.get('priority', 'N/A')}")
         
         # Show first negative test
         if test_cases['negative']:
-            print("\n[NEGATIVE TEST]")
+            lines.append("\n[NEGATIVE TEST]")
             neg_test = test_cases['negative'][0]
-            print(f"  Test ID: {neg_test['test_id']}")
-            print(f"  Test Name: {neg_test['test_name']}")
-            print(f"  Priority: {neg_test.get('priority', 'N/A')}")
+            lines.append(f"  Test ID: {neg_test['test_id']}")
+            lines.append(f"  Test Name: {neg_test['test_name']}")
+            lines.append(f"  Priority: {neg_test.get('priority', 'N/A')}")
         
         # Show first UI test
         if test_cases['ui']:
-            print("\n[UI TEST]")
+            lines.append("\n[UI TEST]")
             ui_test = test_cases['ui'][0]
-            print(f"  Test ID: {ui_test['test_id']}")
-            print(f"  Test Name: {ui_test['test_name']}")
-            print(f"  Priority: {ui_test.get('priority', 'N/A')}")
+            lines.append(f"  Test ID: {ui_test['test_id']}")
+            lines.append(f"  Test Name: {ui_test['test_name']}")
+            lines.append(f"  Priority: {ui_test.get('priority', 'N/A')}")
         
         # Show first functional test
         if test_cases['functional']:
-            print("\n[FUNCTIONAL TEST]")
+            lines.append("\n[FUNCTIONAL TEST]")
             func_test = test_cases['functional'][0]
-            print(f"  Test ID: {func_test['test_id']}")
-            print(f"  Test Name: {func_test['test_name']}")
-            print(f"  Test Type: {func_test.get('test_type', 'N/A')}")
-            print(f"  Priority: {func_test.get('priority', 'N/A')}")
-            print(f"  Steps: {len(func_test.get('steps', []))} steps")
+            lines.append(f"  Test ID: {func_test['test_id']}")
+            lines.append(f"  Test Name: {func_test['test_name']}")
+            lines.append(f"  Test Type: {func_test.get('test_type', 'N/A')}")
+            lines.append(f"  Priority: {func_test.get('priority', 'N/A')}")
+            lines.append(f"  Steps: {len(func_test.get('steps', []))} steps")
         
-        print("\n" + "=" * 60)
-        print("Test generation completed successfully!")
-        print("=" * 60 + "\n")
+        lines.append("\n" + "=" * 60)
+        lines.append("Test generation completed successfully!")
+        lines.append("=" * 60 + "\n")
+        print("\n".join(lines))
         
         return test_cases, report_file
         
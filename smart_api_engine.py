@@ -1,8 +1,130 @@
 import json
 import os
 import re
+import tempfile
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# The pattern sampler walks the stdlib's private regex parse tree. If a Python
+# release moves or reshapes it, samples fall back to a placeholder instead.
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    try:
+        import sre_constants
+        import sre_parse
+    except ImportError:
+        sre_constants = sre_parse = None
+
+_NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9]+')
+# Maps every ASCII character outside [a-zA-Z0-9] to '_' for test-ID paths.
+_ID_TABLE = str.maketrans({chr(code): '_' for code in range(128) if not chr(code).isalnum()})
+_PATH_PARAM_RE = re.compile(r'\{[^}]+\}')
+_NON_DIGIT_RE = re.compile(r'[^0-9]')
+_MISSING = object()
+_HTTP_METHODS = frozenset(('GET', 'POST', 'PUT', 'PATCH', 'DELETE'))
+# Sample values for schema leaf types that need no further inspection.
+_SCALAR_SAMPLES = {'integer': 1, 'number': 1.0, 'boolean': True}
+# Characters tried, in order, when a sample must satisfy a character class.
+_PATTERN_CANDIDATES = 'a0A_-. '
+# Longest sample derived from a spec pattern; {n} repeats in user-supplied specs
+# would otherwise build arbitrarily large strings.
+MAX_PATTERN_SAMPLE_LENGTH = 256
+_PATTERN_FALLBACK = 'sample-text'
+# NamedTemporaryFile creates 0600 files; saved plans get the mode a plain open() would give them.
+_umask = os.umask(0)
+os.umask(_umask)
+REPORT_FILE_MODE = 0o666 & ~_umask
+
+try:
+    _CATEGORY_PATTERNS = {
+        sre_constants.CATEGORY_DIGIT: re.compile(r'\d'),
+        sre_constants.CATEGORY_NOT_DIGIT: re.compile(r'\D'),
+        sre_constants.CATEGORY_SPACE: re.compile(r'\s'),
+        sre_constants.CATEGORY_NOT_SPACE: re.compile(r'\S'),
+        sre_constants.CATEGORY_WORD: re.compile(r'\w'),
+        sre_constants.CATEGORY_NOT_WORD: re.compile(r'\W'),
+    }
+except AttributeError:
+    sre_constants = sre_parse = None
+
+
+class _SampleTooLong(ValueError):
+    """Raised when a pattern's shortest match exceeds MAX_PATTERN_SAMPLE_LENGTH."""
+
+
+def _class_accepts(items, char: str) -> bool:
+    code = ord(char)
+    negate = False
+    for op, arg in items:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL and arg == code:
+            return not negate
+        elif op is sre_constants.RANGE and arg[0] <= code <= arg[1]:
+            return not negate
+        elif op is sre_constants.CATEGORY and arg in _CATEGORY_PATTERNS and _CATEGORY_PATTERNS[arg].fullmatch(char):
+            return not negate
+    return negate
+
+
+def _render_pattern(tokens, groups: Dict[int, str]) -> str:
+    """Build the shortest string the parsed pattern tokens accept."""
+    out = []
+    size = 0
+    for op, arg in tokens:
+        if op is sre_constants.LITERAL:
+            piece = chr(arg)
+        elif op is sre_constants.NOT_LITERAL:
+            piece = next(c for c in _PATTERN_CANDIDATES if ord(c) != arg)
+        elif op is sre_constants.ANY:
+            piece = 'a'
+        elif op is sre_constants.IN:
+            piece = next(c for c in _PATTERN_CANDIDATES if _class_accepts(arg, c))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            low, _high, sub = arg
+            if low > MAX_PATTERN_SAMPLE_LENGTH:
+                raise _SampleTooLong(low)
+            piece = _render_pattern(sub, groups) if low else ''
+            if len(piece) * low > MAX_PATTERN_SAMPLE_LENGTH:
+                raise _SampleTooLong(len(piece) * low)
+            piece *= low
+        elif op is sre_constants.SUBPATTERN:
+            group, sub = arg[0], arg[-1]
+            piece = _render_pattern(sub, groups)
+            if group is not None:
+                groups[group] = piece
+        elif op is sre_constants.BRANCH:
+            piece = _render_pattern(arg[1][0], groups)
+        elif op is sre_constants.GROUPREF:
+            piece = groups.get(arg, '')
+        else:
+            # Anchors and lookarounds add no characters.
+            continue
+        size += len(piece)
+        if size > MAX_PATTERN_SAMPLE_LENGTH:
+            raise _SampleTooLong(size)
+        out.append(piece)
+    return ''.join(out)
+
+
+def _sample_from_pattern(pattern: str) -> Optional[str]:
+    """Return a short string matching ``pattern``, or None if one cannot be derived."""
+    if sre_parse is None:
+        return None
+    try:
+        sample = _render_pattern(sre_parse.parse(pattern), {})
+        if re.search(pattern, sample):
+            return sample
+    except (re.error, StopIteration, TypeError, ValueError, OverflowError,
+            AttributeError, IndexError, RecursionError):
+        pass
+    return None
 
 
 class SmartApiEngine:
@@ -16,7 +138,21 @@ class SmartApiEngine:
 
         self.base_url = base_url.rstrip('/')
         self.spec = self._load_spec(spec_source)
+        # Spec-wide media types used as fallbacks for every operation's headers.
+        self._spec_consumes = self.spec.get('consumes')
+        self._spec_produces = self.spec.get('produces')
         self.test_cases: List[Dict[str, Any]] = []
+        # Keyed by id() of schema objects owned by self.spec, so keys stay valid.
+        self._sample_cache: Dict[int, Any] = {}
+        self._pattern_cache: Dict[str, str] = {}
+        now = datetime.utcnow()
+        # Sample values for string formats, looked up instead of compared one by one.
+        self._format_samples = {
+            'date': now.strftime('%Y-%m-%d'),
+            'date-time': now.isoformat(),
+            'email': 'user@example.com',
+            'uuid': '00000000-0000-4000-8000-000000000000',
+        }
         self.summary = {
             'total': 0,
             'positive': 0,
@@ -35,107 +171,120 @@ class SmartApiEngine:
         if not paths:
             raise ValueError("Specification must include paths")
 
+        cases = self.test_cases
+        positive_count = negative_count = 0
+        for path, method, details in self._iter_operations(paths):
+            test_id = self._build_test_id(method, path)
+            url = self._build_url(path)
+            # Built once and shared by the positive and negative cases.
+            headers = self._build_headers(details)
+            query, body_param = self._classify_params(details)
+            target = {'method': method, 'path': path, 'url': url}
+            request_parts = {'headers': headers, 'query': query}
+            positive_case = {
+                'test_id': f"{test_id}_POS",
+                'name': details.get('summary') or f"{method} {path}",
+                **target,
+                'category': 'positive',
+                'expected_status': self._extract_status(details, success=True),
+                'description': details.get('description', ''),
+                'payload': self._build_payload(details, body_param),
+                **request_parts,
+            }
+            cases.append(positive_case)
+            positive_count += 1
+
+            if details.get('requestBody') or body_param is not None:
+                negative_case = {
+                    'test_id': f"{test_id}_NEG",
+                    'name': f"{method} {path} - missing body",
+                    **target,
+                    'category': 'negative',
+                    'expected_status': self._extract_status(details, success=False),
+                    'description': 'Submit request with missing or invalid payload',
+                    'payload': {},
+                    **request_parts,
+                }
+                cases.append(negative_case)
+                negative_count += 1
+
+        self.summary['positive'] += positive_count
+        self.summary['negative'] += negative_count
+        self.summary['total'] += positive_count + negative_count
+        return cases
+
+    @staticmethod
+    def _iter_operations(paths: Dict[str, Any]):
+        """Yield ``(path, METHOD, details)`` for every supported operation."""
         for path, methods in paths.items():
             if not isinstance(methods, dict):
                 continue
             for method, details in methods.items():
-                if method.upper() not in {'GET', 'POST', 'PUT', 'PATCH', 'DELETE'}:
-                    continue
-                test_id = self._build_test_id(method, path)
-                url = self._build_url(path)
-                positive_case = {
-                    'test_id': f"{test_id}_POS",
-                    'name': details.get('summary') or f"{method.upper()} {path}",
-                    'method': method.upper(),
-                    'path': path,
-                    'url': url,
-                    'category': 'positive',
-                    'expected_status': self._extract_status(details, success=True),
-                    'description': details.get('description', ''),
-                    'payload': self._build_payload(details),
-                    'headers': self._build_headers(details),
-                    'query': self._build_query_params(details),
-                }
-                self._append_case(positive_case, 'positive')
-
-                if self._has_request_body(details):
-                    negative_case = {
-                        'test_id': f"{test_id}_NEG",
-                        'name': f"{method.upper()} {path} - missing body",
-                        'method': method.upper(),
-                        'path': path,
-                        'url': url,
-                        'category': 'negative',
-                        'expected_status': self._extract_status(details, success=False),
-                        'description': 'Submit request with missing or invalid payload',
-                        'payload': {},
-                        'headers': self._build_headers(details),
-                        'query': self._build_query_params(details),
-                    }
-                    self._append_case(negative_case, 'negative')
-
-        return self.test_cases
-
-    def _append_case(self, case: Dict[str, Any], bucket: str):
-        self.test_cases.append(case)
-        self.summary['total'] += 1
-        if bucket in self.summary:
-            self.summary[bucket] += 1
+                method = method.upper()
+                if method in _HTTP_METHODS:
+                    yield path, method, details
 
     def _build_test_id(self, method: str, path: str) -> str:
-        safe_path = re.sub(r'[^a-zA-Z0-9]+', '_', path).strip('_')
-        return f"API_{method.upper()}_{safe_path or 'ROOT'}"
+        # `method` is already upper-cased by _iter_operations.
+        if path.isascii():
+            safe_path = '_'.join(filter(None, path.translate(_ID_TABLE).split('_')))
+        else:
+            safe_path = _NON_ALNUM_RE.sub('_', path).strip('_')
+        return f"API_{method}_{safe_path or 'ROOT'}"
 
     def _build_url(self, path: str) -> str:
         if path.startswith('http'):
             return path
         normalized = path if path.startswith('/') else f'/{path}'
-        normalized = re.sub(r'\{[^}]+\}', 'sample', normalized)
+        normalized = _PATH_PARAM_RE.sub('sample', normalized)
         return f"{self.base_url}{normalized}"
 
     def _extract_status(self, details: Dict[str, Any], success: bool = True) -> int:
         responses = details.get('responses', {})
+        default = 200 if success else 400
         if not responses:
-            return 200 if success else 400
+            return default
         preferred_prefix = '2' if success else '4'
-        for status_code in responses.keys():
+        # One pass: return the first preferred code, else fall back to the first key.
+        first_key = None
+        for status_code in responses:
+            if first_key is None:
+                first_key = status_code
             if isinstance(status_code, str) and status_code.startswith(preferred_prefix):
-                try:
-                    return int(re.sub(r'[^0-9]', '', status_code) or (200 if success else 400))
-                except ValueError:
-                    continue
-        try:
-            first_key = next(iter(responses))
-            return int(re.sub(r'[^0-9]', '', first_key))
-        except StopIteration:
-            return 200 if success else 400
+                return self._parse_status(status_code, default)
+        return self._parse_status(first_key, default)
+
+    @staticmethod
+    def _parse_status(status_code: str, default: int) -> int:
+        # Plain "200"-style keys are the norm; only odd keys like "2XX" need the regex.
+        if status_code.isascii() and status_code.isdigit():
+            return int(status_code)
+        digits = _NON_DIGIT_RE.sub('', status_code)
+        return int(digits) if digits else default
 
     def _build_headers(self, details: Dict[str, Any]) -> Dict[str, str]:
         headers = {}
-        consumes = details.get('consumes') or self.spec.get('consumes')
+        consumes = details.get('consumes') or self._spec_consumes
         if consumes:
             headers['Content-Type'] = consumes[0]
-        produces = details.get('produces') or self.spec.get('produces')
+        produces = details.get('produces') or self._spec_produces
         if produces:
             headers['Accept'] = produces[0]
         return headers
 
-    def _build_query_params(self, details: Dict[str, Any]) -> Dict[str, Any]:
-        params = {}
+    def _classify_params(self, details: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Split parameters in one pass into sampled query params and the first body param."""
+        query = {}
+        body_param = None
         for param in details.get('parameters', []):
-            if param.get('in') == 'query':
-                params[param['name']] = self._sample_value(param.get('schema', {}) or param)
-        return params
+            location = param.get('in')
+            if location == 'query':
+                query[param['name']] = self._sample_value(param.get('schema', {}) or param)
+            elif location == 'body' and body_param is None:
+                body_param = param
+        return query, body_param
 
-    def _has_request_body(self, details: Dict[str, Any]) -> bool:
-        if details.get('requestBody'):
-            return True
-        for param in details.get('parameters', []):
-            if param.get('in') == 'body':
-                return True
-        return False
-
-    def _build_payload(self, details: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _build_payload(self, details: Dict[str, Any], body_param: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         request_body = details.get('requestBody')
         if request_body:
             content = request_body.get('content', {})
@@ -143,15 +292,22 @@ class SmartApiEngine:
             if json_content:
                 return self._sample_value(json_content.get('schema', {}))
 
-        for param in details.get('parameters', []):
-            if param.get('in') == 'body':
-                schema = param.get('schema', {})
-                return self._sample_value(schema)
+        if body_param is not None:
+            return self._sample_value(body_param.get('schema', {}))
         return None
 
     def _sample_value(self, schema: Dict[str, Any]) -> Any:
         if not schema:
             return {}
+        # Specs reuse schema objects across operations; sample each one once.
+        # Samples are shared between cases, which only ever read them.
+        key = id(schema)
+        sample = self._sample_cache.get(key, _MISSING)
+        if sample is _MISSING:
+            sample = self._sample_cache[key] = self._build_sample(schema)
+        return sample
+
+    def _build_sample(self, schema: Dict[str, Any]) -> Any:
         if 'example' in schema:
             return schema['example']
         if 'default' in schema:
@@ -167,24 +323,25 @@ class SmartApiEngine:
             return obj
         if schema_type == 'array':
             return [self._sample_value(schema.get('items', {}))]
-        if schema_type == 'integer':
-            return 1
-        if schema_type == 'number':
-            return 1.0
-        if schema_type == 'boolean':
-            return True
         if schema_type == 'string':
-            fmt = schema.get('format')
-            if fmt == 'date':
-                return datetime.utcnow().strftime('%Y-%m-%d')
-            if fmt == 'date-time':
-                return datetime.utcnow().isoformat()
-            if fmt == 'email':
-                return 'user@example.com'
-            if fmt == 'uuid':
-                return '00000000-0000-4000-8000-000000000000'
-            return schema.get('pattern', 'sample-text')
-        return "sample"
+            sample = self._format_samples.get(schema.get('format'))
+            if sample is not None:
+                return sample
+            pattern = schema.get('pattern')
+            if isinstance(pattern, str):
+                return self._pattern_sample(pattern)
+            return _PATTERN_FALLBACK
+        return _SCALAR_SAMPLES.get(schema_type, "sample")
+
+    def _pattern_sample(self, pattern: str) -> str:
+        # Fields often share a pattern, so derive each sample once.
+        sample = self._pattern_cache.get(pattern)
+        if sample is None:
+            sample = _sample_from_pattern(pattern)
+            if sample is None:
+                sample = _PATTERN_FALLBACK
+            self._pattern_cache[pattern] = sample
+        return sample
 
     def save_report(self) -> str:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -199,8 +356,30 @@ class SmartApiEngine:
             'test_cases': self.test_cases,
         }
 
-        with open(report_path, 'w', encoding='utf-8') as handle:
-            json.dump(payload, handle, indent=2, ensure_ascii=False)
+        data = None
+        if orjson is not None:
+            try:
+                data = orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            except TypeError:
+                # e.g. integers wider than 64 bits in spec examples; json handles those.
+                pass
+        if data is None:
+            data = json.dumps(payload, indent=2, ensure_ascii=False).encode('utf-8')
+
+        # One write into a temp file, then an atomic swap, so downloads never see a partial plan.
+        # The temp name is unique so saves landing on the same timestamp don't collide.
+        handle = tempfile.NamedTemporaryFile(dir='reports', prefix='.api_test_plan_', suffix='.tmp', delete=False)
+        try:
+            with handle:
+                handle.write(data)
+            os.chmod(handle.name, REPORT_FILE_MODE)
+            os.replace(handle.name, report_path)
+        except BaseException:
+            try:
+                os.remove(handle.name)
+            except OSError:
+                pass
+            raise
 
         return report_file
 
@@ -1,14 +1,434 @@
 from playwright.sync_api import sync_playwright, Browser, Page, BrowserContext
+from playwright.sync_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+import atexit
+import copy
 import json
 import time
 import os
 import sys
 import re
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Any
+from functools import lru_cache
+from typing import Dict, List, Any, Tuple
 from urllib.parse import urljoin
+from urllib.request import urlopen
+
+_ERP_MODULE_KEYWORDS = {
+    'student': ['student', 'admission', 'enrollment', 'pupil', 'learner'],
+    'teacher': ['teacher', 'faculty', 'staff', 'instructor'],
+    'academic': ['course', 'subject', 'class', 'section', 'syllabus', 'curriculum'],
+    'attendance': ['attendance', 'present', 'absent', 'leave'],
+    'examination': ['exam', 'test', 'assessment', 'result', 'grade', 'marks'],
+    'finance': ['fee', 'payment', 'expense', 'financial', 'billing', 'invoice'],
+    'library': ['library', 'book', 'issue', 'return'],
+    'hostel': ['hostel', 'room', 'boarding'],
+    'transport': ['transport', 'bus', 'vehicle', 'route'],
+    'report': ['report', 'analytics', 'dashboard', 'statistics']
+}
+_KEYWORD_MODULES = {
+    keyword: module_type
+    for module_type, keywords in _ERP_MODULE_KEYWORDS.items()
+    for keyword in keywords
+}
+# Lookahead so keywords that overlap in the text are all reported
+_MODULE_KEYWORD_RE = re.compile(
+    '(?=({}))'.format('|'.join(re.escape(k) for k in sorted(_KEYWORD_MODULES, key=len, reverse=True)))
+)
+
+def _keyword_re(keywords: List[str]):
+    """Compile keywords into one alternation so a text is scanned once for all of them"""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+
+
+_LOGIN_FIELD_RE = _keyword_re(['username', 'user', 'email', 'login', 'userid', 'user_id', 'usr', 'emailid'])
+_LOGIN_BUTTON_RE = _keyword_re(['login', 'sign in', 'submit', 'log in', 'signin'])
+_OTP_RE = _keyword_re(['otp', 'verification', 'verify', 'code', 'pin', '2fa', 'two-factor'])
+_TABLE_ACTION_RE = _keyword_re(['edit', 'delete', 'view', 'details', 'action'])
+_TABLE_FILTER_RE = _keyword_re(['filter'])
+_TABLE_EXPORT_RE = _keyword_re(['export', 'download', 'excel', 'csv', 'pdf'])
+# Matched case-insensitively against the whole page source after a login attempt
+_LOGIN_SUCCESS_RE = re.compile(r"dashboard|welcome|home", re.I)
+_LOGIN_ERROR_RE = re.compile(r"error|invalid|incorrect|failed", re.I)
+
+_PAGINATION_SELECTOR = ", ".join([
+    ".pagination",
+    "[class*='pagination']",
+    "[class*='pager']",
+    ".page-info",
+    "[class*='page']"
+])
+_TABLE_SEARCH_SELECTOR = ", ".join([
+    "input[type='search']",
+    "input[placeholder*='search' i]",
+    ".search-input",
+    "[class*='search']"
+])
+_SUBMIT_SELECTOR = "button[type='submit'], input[type='submit']"
+_VERIFY_BUTTON_SELECTOR = "button:has-text('verify'), button:has-text('submit'), button[type='submit']"
+
+
+def _css_attr(name: str, value: str) -> str:
+    """Attribute selector for a page-supplied value, quoted so it can't break the CSS"""
+    escaped = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\a ')
+    return f'[{name}="{escaped}"]'
+
+
+# Checked in order; the first table type with a keyword in the headers wins
+_TABLE_TYPE_PATTERNS = tuple(
+    (table_type, _keyword_re(keywords))
+    for table_type, keywords in (
+        ('student_list', ['student', 'name', 'roll', 'admission']),
+        ('fee_record', ['fee', 'payment', 'amount', 'balance']),
+        ('attendance', ['attendance', 'present', 'absent']),
+        ('examination', ['exam', 'test', 'marks', 'grade']),
+        ('teacher_list', ['teacher', 'staff', 'faculty']),
+        ('library', ['book', 'library', 'issue', 'return']),
+        ('transport', ['bus', 'transport', 'route'])
+    )
+)
+
+# Fixed login negative scenarios; generate_negative_test_cases copies them per run
+_LOGIN_NEGATIVE_SCENARIOS = (
+    {
+        'test_id': 'NEG_LOGIN_001',
+        'test_name': 'Login with empty username',
+        'description': 'Verify error message when username is empty',
+        'steps': [
+            'Navigate to login page',
+            'Leave username field empty',
+            'Enter password',
+            'Click login button'
+        ],
+        'expected_result': 'Error message should be displayed',
+        'priority': 'High'
+    },
+    {
+        'test_id': 'NEG_LOGIN_002',
+        'test_name': 'Login with empty password',
+        'description': 'Verify error message when password is empty',
+        'steps': [
+            'Navigate to login page',
+            'Enter username',
+            'Leave password field empty',
+            'Click login button'
+        ],
+        'expected_result': 'Error message should be displayed',
+        'priority': 'High'
+    },
+    {
+        'test_id': 'NEG_LOGIN_003',
+        'test_name': 'Login with invalid credentials',
+        'description': 'Verify error message for invalid credentials',
+        'steps': [
+            'Navigate to login page',
+            'Enter invalid username: invalid_user',
+            'Enter invalid password: invalid_pass',
+            'Click login button'
+        ],
+        'expected_result': 'Invalid credentials error should be displayed',
+        'priority': 'High'
+    },
+    {
+        'test_id': 'NEG_LOGIN_004',
+        'test_name': 'Login with SQL injection attempt',
+        'description': 'Verify system handles SQL injection attempts',
+        'steps': [
+            'Navigate to login page',
+            'Enter username: admin\' OR \'1\'=\'1',
+            'Enter password: test',
+            'Click login button'
+        ],
+        'expected_result': 'SQL injection should be blocked',
+        'priority': 'Critical'
+    },
+    {
+        'test_id': 'NEG_LOGIN_005',
+        'test_name': 'Login with XSS attempt',
+        'description': 'Verify system handles XSS attacks',
+        'steps': [
+            'Navigate to login page',
+            'Enter username: <script>alert("XSS")</script>',
+            'Enter password: test',
+            'Click login button'
+        ],
+        'expected_result': 'XSS attack should be prevented',
+        'priority': 'Critical'
+    }
+)
+
+_SECURITY_PAYLOADS = (
+    ('SQLI', "SQL injection attempt", "admin' OR '1'='1"),
+    ('XSS', "XSS script injection", '<script>alert(\"XSS\")</script>')
+)
+
+_BROWSER_ARGS = [
+    '--start-maximized',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--no-sandbox'
+]
+
+# Playwright's sync API only works on the thread that started it, so launched
+# browsers are shared between engines on the same thread, keyed by
+# (thread, headless).
+_shared_browsers: Dict[Tuple[threading.Thread, bool], Dict[str, Any]] = {}
+_shared_lock = threading.Lock()
+
+
+def _stop_shared(shared: Dict[str, Any]):
+    try:
+        shared['browser'].close()
+    except Exception:
+        pass
+    try:
+        shared['playwright'].stop()
+    except Exception:
+        pass
+
+
+def _get_shared_browser(headless: bool):
+    """Return this thread's shared Chromium, launching it on first use."""
+    key = (threading.current_thread(), headless)
+    with _shared_lock:
+        shared = _shared_browsers.get(key)
+    if shared is None or not shared['browser'].is_connected():
+        users = 0
+        if shared is not None:
+            # The browser went away (crash or window closed); start a fresh one.
+            users = shared['users']
+            _stop_shared(shared)
+        playwright = sync_playwright().start()
+        cdp_url = os.environ.get('SMART_TEST_CDP_URL')
+        try:
+            if cdp_url:
+                # Attach to an already running Chromium (see bootstrap_shared_chromium)
+                browser = playwright.chromium.connect_over_cdp(cdp_url)
+            else:
+                browser = playwright.chromium.launch(headless=headless, args=_BROWSER_ARGS)
+        except Exception:
+            playwright.stop()
+            raise
+        shared = {'playwright': playwright, 'browser': browser, 'users': users}
+        with _shared_lock:
+            _shared_browsers[key] = shared
+    shared['users'] += 1
+    return key, shared
+
+
+def _release_shared_browser(key: Tuple[threading.Thread, bool]):
+    """Drop one engine's claim on a shared browser.
+
+    The main thread keeps its browser for the next engine until exit; worker
+    threads close theirs once the last engine is done so nothing outlives them.
+    """
+    with _shared_lock:
+        shared = _shared_browsers.get(key)
+        if shared is None:
+            return
+        shared['users'] -= 1
+        if shared['users'] > 0 or key[0] is threading.main_thread():
+            return
+        del _shared_browsers[key]
+    _stop_shared(shared)
+
+
+@atexit.register
+def _close_shared_browsers():
+    with _shared_lock:
+        owned = [shared for (thread, _), shared in _shared_browsers.items()
+                 if thread is threading.current_thread()]
+        _shared_browsers.clear()
+    for shared in owned:
+        _stop_shared(shared)
+
+
+def bootstrap_shared_chromium(port: int = 9222, headless: bool = True):
+    """Launch one Chromium with remote debugging and keep it running until Ctrl+C.
+
+    Engines attach to it instead of launching their own browser when
+    SMART_TEST_CDP_URL is set to http://127.0.0.1:<port>.
+    """
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch(
+            headless=headless,
+            args=_BROWSER_ARGS + [f'--remote-debugging-port={port}']
+        )
+        with urlopen(f'http://127.0.0.1:{port}/json/version') as response:
+            endpoint = json.load(response)['webSocketDebuggerUrl']
+        print(f"[INFO] Shared Chromium listening at {endpoint}")
+        print(f"[INFO] Set SMART_TEST_CDP_URL=http://127.0.0.1:{port} to reuse it")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        browser.close()
+
 
 class SmartTestEngine:
+    __slots__ = (
+        'website_url', 'login_id', 'password', 'headed', 'otp_value',
+        'playwright', 'browser', 'context', 'page', '_browser_key',
+        'detected_elements', 'test_cases', 'test_priorities', 'workflow_context'
+    )
+
+    # Links that look like they lead to a numbered form level or step
+    _LEVEL_RE = re.compile(r'level[\s_-]?[1-5]|form[\s_-]?[1-3]|/level/[1-3]|/form/[1-3]', re.IGNORECASE)
+
+    # Finished analyses keyed by (url, login_id), least recently used first.
+    # Entries are (stored_at, analysis) and expire after ANALYSIS_CACHE_TTL seconds
+    # so re-runs pick up changes to the site.
+    ANALYSIS_CACHE_SIZE = 32
+    ANALYSIS_CACHE_TTL = 300
+    _analysis_cache: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    _analysis_cache_lock = threading.Lock()
+
+    # Upper bounds on elements read per page, so huge dashboards take bounded time
+    _MAX_INPUTS = 500
+    _MAX_BUTTONS = 300
+    _MAX_LINKS = 200
+    _MAX_WIDGETS = 140
+
+    # Shared by the scripts below: text of the enclosing label, or else of the
+    # first label among the element's preceding siblings
+    _LABEL_OF_JS = """
+        const labelOf = el => {
+            let label = el.closest('label');
+            if (!label && el.parentElement) {
+                for (const sibling of el.parentElement.children) {
+                    if (sibling === el) break;
+                    if (sibling.tagName === 'LABEL') {
+                        label = sibling;
+                        break;
+                    }
+                }
+            }
+            return label ? (label.innerText || '') : '';
+        };
+    """
+
+    # Attributes and label text of every input, for re-checking a page after navigation
+    _OTP_CANDIDATES_JS = """
+    inputs => {""" + _LABEL_OF_JS + """
+        return inputs.map(el => ({
+            id: el.getAttribute('id'),
+            name: el.getAttribute('name'),
+            placeholder: el.getAttribute('placeholder'),
+            type: el.getAttribute('type'),
+            label: labelOf(el)
+        }));
+    }
+    """
+
+    # Lower-cased text of the first ten buttons/links inside a table
+    _ACTION_TEXTS_JS = "els => els.slice(0, 10).map(e => (e.innerText || '').trim().toLowerCase())"
+
+    # A page counts as ready once it has something to interact with
+    _READY_JS = "document.querySelectorAll('input, button, a, form').length > 0"
+
+    # One pass over the document that bins every element analyze_website cares
+    # about. Per-selector groups (buttons, nav links) are kept apart and
+    # concatenated so results come back in the same order as separate queries.
+    _SCAN_PAGE_JS = """
+    (limits) => {""" + _LABEL_OF_JS + """
+        const navSelectors = [
+            'nav a', '.sidebar a', '.menu a', "[class*='nav'] a",
+            "[class*='menu'] a", "[class*='sidebar'] a", '.navbar a'
+        ];
+        const widgetSelectors = [
+            '.card', '.widget', '.panel', "[class*='card']",
+            "[class*='widget']", "[class*='stat']", "[class*='dashboard']"
+        ];
+        const scan = {
+            inputs: [], textareas: [], links: [], forms: [],
+            selects: [], iframes: [], tables: [], widgets: []
+        };
+        const buttonGroups = [[], [], [], []];
+        const navGroups = navSelectors.map(() => []);
+        const widgetSelector = widgetSelectors.join(', ');
+        const text = el => (el.innerText || '').trim();
+        // textContent needs no layout pass; used where rendered spacing doesn't matter
+        const rawText = el => (el.textContent || '').trim();
+        const attr = (el, name) => el.getAttribute(name);
+        const button = (el, tag) => ({
+            text: text(el),
+            value: attr(el, 'value'),
+            aria_label: attr(el, 'aria-label'),
+            id: attr(el, 'id'),
+            cls: attr(el, 'class'),
+            type: attr(el, 'type'),
+            tag: tag
+        });
+        const tags = ['input', 'textarea', 'button', 'a', 'form', 'select', 'iframe', 'table'];
+
+        for (const el of document.querySelectorAll(tags.join(', ') + ', ' + widgetSelector)) {
+            const tag = el.tagName.toLowerCase();
+            if (tag === 'input') {
+                const type = (attr(el, 'type') || '').toLowerCase();
+                if (scan.inputs.length < limits.inputs) scan.inputs.push({
+                    type: attr(el, 'type'),
+                    name: attr(el, 'name'),
+                    id: attr(el, 'id'),
+                    placeholder: attr(el, 'placeholder'),
+                    required: el.hasAttribute('required'),
+                    cls: attr(el, 'class'),
+                    aria_label: attr(el, 'aria-label'),
+                    label: labelOf(el)
+                });
+                if (type === 'submit') buttonGroups[1].push(button(el, tag));
+                else if (type === 'button') buttonGroups[2].push(button(el, tag));
+            } else if (tag === 'textarea') {
+                scan.textareas.push({
+                    name: attr(el, 'name'),
+                    id: attr(el, 'id'),
+                    placeholder: attr(el, 'placeholder'),
+                    required: el.hasAttribute('required'),
+                    cls: attr(el, 'class')
+                });
+            } else if (tag === 'button') {
+                buttonGroups[0].push(button(el, tag));
+            } else if (tag === 'a') {
+                if (scan.links.length < 30) {
+                    scan.links.push({href: attr(el, 'href'), text: text(el)});
+                }
+                const cls = attr(el, 'class') || '';
+                if (cls.includes('button') || cls.includes('btn')) {
+                    buttonGroups[3].push(button(el, tag));
+                }
+                navSelectors.forEach((selector, i) => {
+                    if (el.matches(selector)) {
+                        navGroups[i].push({text: text(el), href: attr(el, 'href'), id: attr(el, 'id')});
+                    }
+                });
+            } else if (tag === 'form') {
+                scan.forms.push({action: attr(el, 'action'), method: attr(el, 'method'), id: attr(el, 'id')});
+            } else if (tag === 'select') {
+                scan.selects.push({name: attr(el, 'name'), id: attr(el, 'id')});
+            } else if (tag === 'iframe' && scan.iframes.length < 10) {
+                scan.iframes.push({id: attr(el, 'id'), name: attr(el, 'name'), src: attr(el, 'src')});
+            } else if (tag === 'table' && scan.tables.length < 10) {
+                scan.tables.push({
+                    id: attr(el, 'id'),
+                    headers: Array.from(el.querySelectorAll('th')).map(rawText).filter(Boolean),
+                    row_count: el.querySelectorAll('tr').length
+                });
+            }
+
+            // Each element is visited once, so a widget matching several selectors is listed once
+            if (scan.widgets.length < limits.widgets && el.matches(widgetSelector)) {
+                scan.widgets.push({id: attr(el, 'id'), cls: attr(el, 'class'), text: rawText(el)});
+            }
+        }
+
+        scan.buttons = [].concat(...buttonGroups).slice(0, limits.buttons);
+        scan.nav_links = [].concat(...navGroups).slice(0, limits.links);
+        scan.title = document.title;
+        return scan;
+    }
+    """
+
     def __init__(self, website_url: str, login_id: str, password: str, headed: bool = True, otp_value: str = None):
         self.website_url = website_url
         self.login_id = login_id
@@ -19,6 +439,7 @@ class SmartTestEngine:
         self.browser = None
         self.context = None
         self.page = None
+        self._browser_key = None
         self.detected_elements = {}
         self.test_cases = {
             'positive': [],
@@ -34,20 +455,10 @@ class SmartTestEngine:
     def initialize_driver(self):
         """Initialize Playwright Browser"""
         try:
-            self.playwright = sync_playwright().start()
-            
-            # Launch browser with options
-            browser_args = [
-                '--start-maximized',
-                '--disable-blink-features=AutomationControlled',
-                '--disable-dev-shm-usage',
-                '--no-sandbox'
-            ]
-            
-            self.browser = self.playwright.chromium.launch(
-                headless=not self.headed,
-                args=browser_args
-            )
+            # Reuse this thread's browser; each engine still gets its own context
+            self._browser_key, shared = _get_shared_browser(headless=not self.headed)
+            self.playwright = shared['playwright']
+            self.browser = shared['browser']
             
             # Create context with viewport
             self.context = self.browser.new_context(
@@ -76,22 +487,29 @@ class SmartTestEngine:
             print(f"[INFO] Navigating to: {self.website_url}")
             self.page.goto(self.website_url, wait_until='domcontentloaded', timeout=60000)
             
-            # Wait for page to load with timeout
-            try:
-                self.page.wait_for_load_state('networkidle', timeout=30000)
-            except Exception as e:
-                print(f"[WARNING] Network idle timeout, trying load state: {e}")
-                try:
-                    self.page.wait_for_load_state('load', timeout=15000)
-                except:
-                    print("[WARNING] Load state timeout, continuing anyway...")
-                    time.sleep(2)  # Give it a small delay
+            self._wait_until_ready(self.page)
             
         except Exception as e:
             error_msg = str(e)
             print(f"[ERROR] Failed to navigate to website: {error_msg}")
             raise Exception(f"Cannot reach website '{self.website_url}'. Please check: 1) URL is correct, 2) Website is accessible, 3) Internet connection is working. Error: {error_msg}")
         
+        # The page is still navigated above so login and test steps can use it;
+        # only the scan and form-level analysis are skipped on a cache hit.
+        cache_key = (self.website_url.rstrip('/'), self.login_id)
+        cached = self._cached_analysis(cache_key)
+        if cached is not None:
+            print("[INFO] Reusing cached analysis for this website")
+            self.detected_elements = cached
+            return cached
+        
+        # Every element class (and the title) is read in a single DOM walk; see _SCAN_PAGE_JS.
+        try:
+            scan = self._scan_page()
+        except Exception as e:
+            print(f"Error scanning page: {e}")
+            scan = {}
+        
         detected = {
             'forms': [],
             'input_fields': [],
@@ -104,181 +522,118 @@ class SmartTestEngine:
             'textareas': [],
             'iframes': [],
             'tables': [],
-            'page_title': self.page.title(),
+            'page_title': scan.get('title', ''),
             'current_url': self.page.url
         }
-        
+
         # Detect Input Fields
-        try:
-            inputs = self.page.locator("input").all()
-            for inp in inputs:
-                try:
-                    input_type = (inp.get_attribute("type") or "text").lower()
-                    input_name = inp.get_attribute("name") or inp.get_attribute("id") or "unnamed"
-                    placeholder = inp.get_attribute("placeholder") or ""
-                    field_meta = {
-                        'type': input_type,
-                        'name': input_name,
-                        'id': inp.get_attribute("id"),
-                        'placeholder': placeholder,
-                        'required': inp.get_attribute("required") is not None,
-                        'class': inp.get_attribute("class") or ""
-                    }
-                    detected['input_fields'].append(field_meta)
-                    
-                    if input_type == 'checkbox':
-                        detected['checkboxes'].append({
-                            'name': input_name,
-                            'id': field_meta['id'],
-                            'label': inp.get_attribute("aria-label") or placeholder or input_name
-                        })
-                    elif input_type == 'radio':
-                        detected['radio_buttons'].append({
-                            'name': input_name,
-                            'id': field_meta['id'],
-                            'label': inp.get_attribute("aria-label") or placeholder or input_name
-                        })
-                except:
-                    continue
-        except Exception as e:
-            print(f"Error detecting inputs: {e}")
+        for inp in scan.get('inputs', []):
+            input_type = (inp['type'] or "text").lower()
+            input_name = inp['name'] or inp['id'] or "unnamed"
+            placeholder = inp['placeholder'] or ""
+            field_meta = {
+                'type': input_type,
+                'name': input_name,
+                'id': inp['id'],
+                'placeholder': placeholder,
+                'required': inp['required'],
+                'class': inp['cls'] or "",
+                'label': inp['label']
+            }
+            detected['input_fields'].append(field_meta)
+            
+            if input_type == 'checkbox':
+                detected['checkboxes'].append({
+                    'name': input_name,
+                    'id': field_meta['id'],
+                    'label': inp['aria_label'] or placeholder or input_name
+                })
+            elif input_type == 'radio':
+                detected['radio_buttons'].append({
+                    'name': input_name,
+                    'id': field_meta['id'],
+                    'label': inp['aria_label'] or placeholder or input_name
+                })
 
         # Detect Textareas
-        try:
-            textareas = self.page.locator("textarea").all()
-            for area in textareas:
-                try:
-                    area_name = area.get_attribute("name") or area.get_attribute("id") or "textarea"
-                    field_meta = {
-                        'type': 'textarea',
-                        'name': area_name,
-                        'id': area.get_attribute("id"),
-                        'placeholder': area.get_attribute("placeholder") or "",
-                        'required': area.get_attribute("required") is not None,
-                        'class': area.get_attribute("class") or ""
-                    }
-                    detected['textareas'].append(field_meta)
-                    detected['input_fields'].append(field_meta)
-                except:
-                    continue
-        except Exception as e:
-            print(f"Error detecting textareas: {e}")
+        for area in scan.get('textareas', []):
+            field_meta = {
+                'type': 'textarea',
+                'name': area['name'] or area['id'] or "textarea",
+                'id': area['id'],
+                'placeholder': area['placeholder'] or "",
+                'required': area['required'],
+                'class': area['cls'] or ""
+            }
+            detected['textareas'].append(field_meta)
+            detected['input_fields'].append(field_meta)
         
         # Detect Buttons
-        try:
-            buttons = self.page.locator("button").all()
-            buttons += self.page.locator("input[type='submit']").all()
-            buttons += self.page.locator("input[type='button']").all()
-            buttons += self.page.locator("a[class*='button'], a[class*='btn']").all()
+        seen_buttons = set()
+        for btn in scan.get('buttons', []):
+            btn_text = btn['text'] or btn['value'] or btn['aria_label'] or "Button"
+            btn_id = btn['id'] or ""
             
-            seen_buttons = set()
-            for btn in buttons:
-                try:
-                    btn_text = btn.inner_text().strip() or btn.get_attribute("value") or btn.get_attribute("aria-label") or "Button"
-                    btn_id = btn.get_attribute("id") or ""
-                    
-                    if btn_id in seen_buttons:
-                        continue
-                    seen_buttons.add(btn_id)
-                    
-                    tag_name = btn.evaluate("el => el.tagName.toLowerCase()")
-                    detected['buttons'].append({
-                        'text': btn_text,
-                        'id': btn_id,
-                        'class': btn.get_attribute("class") or "",
-                        'type': btn.get_attribute("type") or "button",
-                        'tag': tag_name
-                    })
-                except:
-                    continue
-        except Exception as e:
-            print(f"Error detecting buttons: {e}")
+            if btn_id in seen_buttons:
+                continue
+            seen_buttons.add(btn_id)
+            
+            detected['buttons'].append({
+                'text': btn_text,
+                'id': btn_id,
+                'class': btn['cls'] or "",
+                'type': btn['type'] or "button",
+                'tag': btn['tag']
+            })
         
         # Detect Links
-        try:
-            links = self.page.locator("a").all()[:30]
-            seen_links = set()
-            for link in links:
-                try:
-                    href = link.get_attribute("href")
-                    link_text = link.inner_text().strip()
-                    if href and (link_text or href not in seen_links):
-                        seen_links.add(href)
-                        detected['links'].append({
-                            'text': link_text or href,
-                            'href': href
-                        })
-                except:
-                    continue
-        except Exception as e:
-            print(f"Error detecting links: {e}")
+        seen_links = set()
+        for link in scan.get('links', []):
+            href = link['href']
+            link_text = link['text']
+            if href and (link_text or href not in seen_links):
+                seen_links.add(href)
+                detected['links'].append({
+                    'text': link_text or href,
+                    'href': href
+                })
         
         # Detect Forms
-        try:
-            forms = self.page.locator("form").all()
-            for form in forms:
-                try:
-                    detected['forms'].append({
-                        'action': form.get_attribute("action") or "",
-                        'method': form.get_attribute("method") or "get",
-                        'id': form.get_attribute("id")
-                    })
-                except:
-                    continue
-        except Exception as e:
-            print(f"Error detecting forms: {e}")
+        for form in scan.get('forms', []):
+            detected['forms'].append({
+                'action': form['action'] or "",
+                'method': form['method'] or "get",
+                'id': form['id']
+            })
         
         # Detect Dropdowns
-        try:
-            selects = self.page.locator("select").all()
-            for select in selects:
-                try:
-                    detected['dropdowns'].append({
-                        'name': select.get_attribute("name") or select.get_attribute("id"),
-                        'id': select.get_attribute("id")
-                    })
-                except:
-                    continue
-        except Exception as e:
-            print(f"Error detecting dropdowns: {e}")
+        for select in scan.get('selects', []):
+            detected['dropdowns'].append({
+                'name': select['name'] or select['id'],
+                'id': select['id']
+            })
 
         # Detect Iframes
-        try:
-            frames = self.page.locator("iframe").all()[:10]
-            for idx, frame in enumerate(frames):
-                try:
-                    detected['iframes'].append({
-                        'id': frame.get_attribute("id") or f"iframe_{idx + 1}",
-                        'name': frame.get_attribute("name"),
-                        'src': frame.get_attribute("src")
-                    })
-                except:
-                    continue
-        except Exception as e:
-            print(f"Error detecting iframes: {e}")
+        for idx, frame in enumerate(scan.get('iframes', [])):
+            detected['iframes'].append({
+                'id': frame['id'] or f"iframe_{idx + 1}",
+                'name': frame['name'],
+                'src': frame['src']
+            })
 
         # Detect Tables
-        try:
-            tables = self.page.locator("table").all()[:10]
-            for idx, table in enumerate(tables):
-                try:
-                    headers = [th.inner_text().strip() for th in table.locator("th").all() if th.inner_text().strip()]
-                    rows = table.locator("tr").all()
-                    detected['tables'].append({
-                        'id': table.get_attribute("id") or f"table_{idx + 1}",
-                        'headers': headers[:8],
-                        'row_count': len(rows)
-                    })
-                except:
-                    continue
-        except Exception as e:
-            print(f"Error detecting tables: {e}")
+        for idx, table in enumerate(scan.get('tables', [])):
+            detected['tables'].append({
+                'id': table['id'] or f"table_{idx + 1}",
+                'headers': table['headers'][:8],
+                'row_count': table['row_count']
+            })
         
         # Detect School ERP Modules
-        detected['modules'] = self.detect_erp_modules()
+        detected['modules'] = self.detect_erp_modules(scan.get('nav_links'))
         
         # Detect Dashboard Widgets
-        detected['dashboard_widgets'] = self.detect_dashboard_widgets()
+        detected['dashboard_widgets'] = self.detect_dashboard_widgets(scan.get('widgets'))
         
         # Enhanced Table Analysis for ERP
         detected['table_details'] = self.analyze_erp_tables(detected.get('tables', []))
@@ -287,61 +642,106 @@ class SmartTestEngine:
         detected['form_levels'] = self._detect_form_levels()
         
         self.detected_elements = detected
+        self._store_analysis(cache_key, detected)
         return detected
     
-    def detect_erp_modules(self) -> List[Dict[str, Any]]:
+    @classmethod
+    def _cached_analysis(cls, cache_key: Tuple[str, str]):
+        """Return a private copy of a fresh cached analysis, or None"""
+        with cls._analysis_cache_lock:
+            entry = cls._analysis_cache.get(cache_key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > cls.ANALYSIS_CACHE_TTL:
+                del cls._analysis_cache[cache_key]
+                return None
+            cls._analysis_cache.move_to_end(cache_key)
+            # Copied so callers editing detected_elements can't change the cache
+            return copy.deepcopy(entry[1])
+    
+    @classmethod
+    def _store_analysis(cls, cache_key: Tuple[str, str], detected: Dict[str, Any]):
+        snapshot = copy.deepcopy(detected)
+        with cls._analysis_cache_lock:
+            cls._analysis_cache[cache_key] = (time.monotonic(), snapshot)
+            cls._analysis_cache.move_to_end(cache_key)
+            while len(cls._analysis_cache) > cls.ANALYSIS_CACHE_SIZE:
+                cls._analysis_cache.popitem(last=False)
+    
+    @classmethod
+    def invalidate_cache(cls, url: str = None):
+        """Forget cached analyses for url, or for every website when url is None"""
+        with cls._analysis_cache_lock:
+            if url is None:
+                cls._analysis_cache.clear()
+                return
+            url = url.rstrip('/')
+            for key in [key for key in cls._analysis_cache if key[0] == url]:
+                del cls._analysis_cache[key]
+    
+    def _wait_until_ready(self, page: Page):
+        """Wait for interactive elements to appear rather than for network idle,
+        which chatty pages (polling, analytics) may never reach"""
+        try:
+            page.wait_for_function(self._READY_JS, timeout=5000)
+        except Exception:
+            print("[WARNING] No interactive elements yet, continuing anyway...")
+        # Settle on the load event rather than a fixed sleep; returns at once if already loaded
+        try:
+            page.wait_for_function("document.readyState === 'complete'", timeout=2000)
+        except Exception:
+            pass
+    
+    @staticmethod
+    def _capped(locator, cap: int) -> List[Any]:
+        """Return at most cap matches of locator without resolving the rest"""
+        return [locator.nth(i) for i in range(min(locator.count(), cap))]
+    
+    @staticmethod
+    def _read_attrs(locator, *names: str) -> Dict[str, Any]:
+        """Read several attributes of one element, plus its lower-cased 'tag', in a single round-trip"""
+        return locator.evaluate(
+            "(el, names) => Object.fromEntries(names.map(name => [name, el.getAttribute(name)])"
+            ".concat([['tag', el.tagName.toLowerCase()]]))",
+            list(names)
+        )
+    
+    def _scan_page(self) -> Dict[str, Any]:
+        """Read every element class analyze_website needs in one evaluate call"""
+        return self.page.evaluate(self._SCAN_PAGE_JS, {
+            'inputs': self._MAX_INPUTS,
+            'buttons': self._MAX_BUTTONS,
+            'links': self._MAX_LINKS,
+            'widgets': self._MAX_WIDGETS
+        })
+
+    def detect_erp_modules(self, nav_links: List[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Detect School ERP modules from navigation menu"""
         modules = []
-        erp_module_keywords = {
-            'student': ['student', 'admission', 'enrollment', 'pupil', 'learner'],
-            'teacher': ['teacher', 'faculty', 'staff', 'instructor'],
-            'academic': ['course', 'subject', 'class', 'section', 'syllabus', 'curriculum'],
-            'attendance': ['attendance', 'present', 'absent', 'leave'],
-            'examination': ['exam', 'test', 'assessment', 'result', 'grade', 'marks'],
-            'finance': ['fee', 'payment', 'expense', 'financial', 'billing', 'invoice'],
-            'library': ['library', 'book', 'issue', 'return'],
-            'hostel': ['hostel', 'room', 'boarding'],
-            'transport': ['transport', 'bus', 'vehicle', 'route'],
-            'report': ['report', 'analytics', 'dashboard', 'statistics']
-        }
         
         try:
-            # Check navigation menus (nav, sidebar, menu)
-            nav_selectors = [
-                "nav a",
-                ".sidebar a",
-                ".menu a",
-                "[class*='nav'] a",
-                "[class*='menu'] a",
-                "[class*='sidebar'] a",
-                ".navbar a"
-            ]
+            # Links under navigation menus (nav, sidebar, menu)
+            if nav_links is None:
+                nav_links = self._scan_page()['nav_links']
             
             all_links = []
-            for selector in nav_selectors:
-                try:
-                    links = self.page.locator(selector).all()
-                    for link in links:
-                        try:
-                            text = link.inner_text().strip().lower()
-                            href = link.get_attribute("href") or ""
-                            if text and len(text) > 1:
-                                all_links.append({
-                                    'text': text,
-                                    'href': href,
-                                    'id': link.get_attribute("id") or ""
-                                })
-                        except:
-                            continue
-                except:
-                    continue
+            for link in nav_links:
+                text = link['text'].lower()
+                if text and len(text) > 1:
+                    all_links.append({
+                        'text': text,
+                        'href': link['href'] or "",
+                        'id': link['id'] or ""
+                    })
             
             # Detect modules based on keywords
             detected_modules = {}
             for link in all_links:
-                link_text = link['text']
-                for module_type, keywords in erp_module_keywords.items():
-                    if any(keyword in link_text for keyword in keywords):
+                matched = {_KEYWORD_MODULES[m.group(1)] for m in _MODULE_KEYWORD_RE.finditer(link['text'])}
+                if not matched:
+                    continue
+                for module_type in _ERP_MODULE_KEYWORDS:
+                    if module_type in matched:
                         if module_type not in detected_modules:
                             detected_modules[module_type] = {
                                 'name': module_type.title(),
@@ -363,55 +763,41 @@ class SmartTestEngine:
         
         return modules
     
-    def detect_dashboard_widgets(self) -> List[Dict[str, Any]]:
+    def detect_dashboard_widgets(self, elements: List[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Detect dashboard widgets (cards, stats, charts)"""
         widgets = []
         
         try:
-            # Detect widget-like elements (cards, panels, stats)
-            widget_selectors = [
-                ".card",
-                ".widget",
-                ".panel",
-                "[class*='card']",
-                "[class*='widget']",
-                "[class*='stat']",
-                "[class*='dashboard']"
-            ]
+            # Widget-like elements (cards, panels, stats)
+            if elements is None:
+                elements = self._scan_page()['widgets']
             
             seen_widgets = set()
-            for selector in widget_selectors:
-                try:
-                    elements = self.page.locator(selector).all()[:20]
-                    for element in elements:
-                        try:
-                            element_id = element.get_attribute("id") or ""
-                            element_class = element.get_attribute("class") or ""
-                            text = element.inner_text().strip()
-                            
-                            # Skip if too small or duplicate
-                            if len(text) < 5 or element_id in seen_widgets:
-                                continue
-                            
-                            seen_widgets.add(element_id)
-                            
-                            widgets.append({
-                                'id': element_id or f"widget_{len(widgets) + 1}",
-                                'class': element_class,
-                                'title': text[:50] if text else '',
-                                'type': self._classify_widget_type(element_class, text)
-                            })
-                        except:
-                            continue
-                except:
+            for element in elements:
+                element_id = element['id'] or ""
+                element_class = element['cls'] or ""
+                text = element['text']
+                
+                # Skip if too small or duplicate
+                if len(text) < 5 or element_id in seen_widgets:
                     continue
+                
+                seen_widgets.add(element_id)
+                
+                widgets.append({
+                    'id': element_id or f"widget_{len(widgets) + 1}",
+                    'class': element_class,
+                    'title': text[:50] if text else '',
+                    'type': self._classify_widget_type(element_class, text)
+                })
             
         except Exception as e:
             print(f"[WARNING] Error detecting dashboard widgets: {e}")
         
         return widgets
     
-    def _classify_widget_type(self, element_class: str, text: str) -> str:
+    @staticmethod
+    def _classify_widget_type(element_class: str, text: str) -> str:
         """Classify widget type based on class and content"""
         class_lower = element_class.lower()
         text_lower = text.lower()
@@ -432,44 +818,16 @@ class SmartTestEngine:
         table_details = []
         
         try:
-            for table_info in tables:
+            # The scanned tables are the first ones in document order, so index into one query
+            all_tables = self.page.locator("table").all()
+            for idx, table_info in enumerate(tables):
                 table_id = table_info.get('id', '')
-                headers = table_info.get('headers', [])
                 
-                # Try to locate the table
                 try:
-                    if table_id and table_id.startswith('table_'):
-                        table_locator = self.page.locator("table").first
-                    else:
-                        table_locator = self.page.locator(f"table#{table_id}").first
-                    
-                    if not table_locator.count():
-                        table_locator = self.page.locator("table").first
-                    
-                    # Analyze table type based on headers
-                    table_type = self._classify_erp_table(headers)
-                    
-                    # Get row count and sample data
-                    rows = table_locator.locator("tbody tr, tr").all()
-                    row_count = len(rows)
-                    
-                    # Get pagination info if exists
-                    pagination = self._detect_table_pagination(table_locator)
-                    
-                    # Detect action buttons in table
-                    action_buttons = self._detect_table_actions(table_locator)
-                    
-                    table_details.append({
-                        'id': table_id,
-                        'headers': headers,
-                        'row_count': row_count,
-                        'type': table_type,
-                        'pagination': pagination,
-                        'actions': action_buttons,
-                        'has_search': self._has_table_search(table_locator),
-                        'has_filter': self._has_table_filter(table_locator),
-                        'has_export': self._has_table_export(table_locator)
-                    })
+                    if idx >= len(all_tables):
+                        print(f"[WARNING] Table {table_id} is no longer on the page")
+                        continue
+                    table_details.append(self._analyze_table(table_info, all_tables[idx]))
                     
                 except Exception as e:
                     print(f"[WARNING] Error analyzing table {table_id}: {e}")
@@ -494,176 +852,176 @@ class SmartTestEngine:
         form_levels = []
         
         try:
-            # Look for navigation links that might lead to different form levels
-            level_patterns = [
-                r'level[\s_-]?1',
-                r'level[\s_-]?2', 
-                r'level[\s_-]?3',
-                r'level[\s_-]?4',
-                r'level[\s_-]?5',
-                r'form[\s_-]?1',
-                r'form[\s_-]?2',
-                r'form[\s_-]?3',
-                r'/level/1',
-                r'/level/2',
-                r'/level/3',
-                r'/form/1',
-                r'/form/2',
-                r'/form/3'
-            ]
-            
             # Get all links
-            links = self.page.locator("a").all()
+            links = self._capped(self.page.locator("a"), self._MAX_LINKS)
             level_links = []
+            seen_urls = set()
             
             for link in links:
                 try:
-                    href = link.get_attribute("href") or ""
-                    link_text = link.inner_text().strip().lower()
+                    link_data = link.evaluate("el => ({href: el.getAttribute('href'), text: el.innerText.trim()})")
+                    href = link_data['href'] or ""
+                    link_text = link_data['text'].lower()
                     
                     # Check if link contains level/form pattern
-                    for pattern in level_patterns:
-                        if re.search(pattern, href, re.IGNORECASE) or re.search(pattern, link_text, re.IGNORECASE):
-                            full_url = self._resolve_url(href)
-                            # Avoid duplicates
-                            if full_url not in [l.get('full_url', '') for l in level_links]:
-                                level_links.append({
-                                    'text': link.inner_text().strip(),
-                                    'href': href,
-                                    'full_url': full_url
-                                })
-                            break
+                    if self._LEVEL_RE.search(href) or self._LEVEL_RE.search(link_text):
+                        full_url = self._resolve_url(href)
+                        # Avoid duplicates
+                        if full_url not in seen_urls:
+                            seen_urls.add(full_url)
+                            level_links.append({
+                                'text': link_data['text'],
+                                'href': href,
+                                'full_url': full_url
+                            })
                 except:
                     continue
             
             # If level links found, analyze each level
             if level_links:
                 print(f"[INFO] Found {len(level_links)} form level links. Analyzing each level...")
-                original_url = self.page.url
                 
+                # Open every level in its own tab first so the pages load side by
+                # side; the sync API is single-threaded, so the analysis itself
+                # still runs one page at a time. The main page is left untouched.
+                level_pages = []
                 for idx, level_link in enumerate(level_links[:5]):  # Max 5 levels
+                    level_url = level_link['full_url']
+                    print(f"[INFO] Navigating to level: {level_url}")
+                    level_page = self.context.new_page()
+                    level_page.set_default_timeout(60000)
                     try:
-                        level_url = level_link['full_url']
-                        print(f"[INFO] Analyzing Level {idx + 1}: {level_url}")
-                        
-                        # Navigate to level
-                        try:
-                            print(f"[INFO] Navigating to level: {level_url}")
-                            self.page.goto(level_url, wait_until='domcontentloaded', timeout=60000)
-                            
-                            # Wait for page load with fallback
-                            try:
-                                self.page.wait_for_load_state('networkidle', timeout=30000)
-                            except:
-                                try:
-                                    self.page.wait_for_load_state('load', timeout=15000)
-                                except:
-                                    print("[WARNING] Level page load timeout, continuing...")
-                                    time.sleep(2)
-                        except Exception as e:
-                            print(f"[WARNING] Failed to navigate to level {idx + 1}: {e}")
-                            continue
-                        
-                        time.sleep(1)  # Small delay for page to stabilize
-                        
-                        # Detect forms on this level
-                        forms = self.page.locator("form").all()
-                        inputs = self.page.locator("input, textarea, select").all()
-                        
-                        level_data = {
-                            'level_number': idx + 1,
-                            'level_name': level_link['text'] or f'Level {idx + 1}',
-                            'url': level_url,
-                            'form_count': len(forms),
-                            'input_count': len(inputs),
-                            'forms': []
-                        }
-                        
-                        # Analyze each form on this level
-                        for form_idx, form in enumerate(forms):
-                            try:
-                                form_inputs = form.locator("input, textarea, select").all()
-                                form_data = {
-                                    'form_id': form.get_attribute("id") or f"form_{form_idx + 1}",
-                                    'action': form.get_attribute("action") or "",
-                                    'method': form.get_attribute("method") or "get",
-                                    'input_fields': []
-                                }
-                                
-                                for inp in form_inputs:
-                                    try:
-                                        tag_name = inp.evaluate("el => el.tagName.toLowerCase()")
-                                        field_data = {
-                                            'type': tag_name,
-                                            'name': inp.get_attribute("name") or inp.get_attribute("id") or "",
-                                            'id': inp.get_attribute("id"),
-                                            'placeholder': inp.get_attribute("placeholder") or "",
-                                            'required': inp.get_attribute("required") is not None,
-                                            'label': ''
-                                        }
-                                        
-                                        # Get label if exists
-                                        try:
-                                            field_id = inp.get_attribute("id")
-                                            if field_id:
-                                                label = self.page.locator(f"label[for='{field_id}']").first
-                                                if label.count():
-                                                    field_data['label'] = label.inner_text().strip()
-                                        except:
-                                            pass
-                                        
-                                        if tag_name == 'input':
-                                            field_data['input_type'] = inp.get_attribute("type") or "text"
-                                        elif tag_name == 'select':
-                                            options = inp.locator("option").all()
-                                            field_data['options'] = [opt.inner_text().strip() for opt in options[:10] if opt.inner_text().strip()]
-                                        
-                                        form_data['input_fields'].append(field_data)
-                                    except:
-                                        continue
-                                
-                                level_data['forms'].append(form_data)
-                            except:
-                                continue
-                        
-                        form_levels.append(level_data)
-                        
+                        level_page.goto(level_url, wait_until='commit', timeout=60000)
                     except Exception as e:
-                        print(f"[WARNING] Failed to analyze level {idx + 1}: {e}")
+                        print(f"[WARNING] Failed to navigate to level {idx + 1}: {e}")
+                        level_page.close()
                         continue
+                    level_pages.append((idx, level_link, level_page))
                 
-                # Navigate back to main page
-                try:
-                    self.page.goto(original_url, wait_until='domcontentloaded', timeout=15000)
-                    self.page.wait_for_load_state('networkidle', timeout=10000)
-                except:
-                    pass
+                for idx, level_link, level_page in level_pages:
+                    try:
+                        print(f"[INFO] Analyzing Level {idx + 1}: {level_link['full_url']}")
+                        form_levels.append(self._analyze_level(level_page, idx, level_link))
+                    except Exception as e:
+                        print(f"[WARNING] Failed to analyze level {idx + 1}: {e}")
+                    finally:
+                        level_page.close()
         
         except Exception as e:
             print(f"[WARNING] Error detecting form levels: {e}")
         
         return form_levels
     
-    def _classify_erp_table(self, headers: List[str]) -> str:
-        """Classify table type based on headers"""
-        headers_text = " ".join([h.lower() for h in headers])
-        
-        if any(keyword in headers_text for keyword in ['student', 'name', 'roll', 'admission']):
-            return 'student_list'
-        elif any(keyword in headers_text for keyword in ['fee', 'payment', 'amount', 'balance']):
-            return 'fee_record'
-        elif any(keyword in headers_text for keyword in ['attendance', 'present', 'absent']):
-            return 'attendance'
-        elif any(keyword in headers_text for keyword in ['exam', 'test', 'marks', 'grade']):
-            return 'examination'
-        elif any(keyword in headers_text for keyword in ['teacher', 'staff', 'faculty']):
-            return 'teacher_list'
-        elif any(keyword in headers_text for keyword in ['book', 'library', 'issue', 'return']):
-            return 'library'
-        elif any(keyword in headers_text for keyword in ['bus', 'transport', 'route']):
-            return 'transport'
-        else:
-            return 'generic'
+    def _analyze_level(self, page: Page, idx: int, level_link: Dict[str, Any]) -> Dict[str, Any]:
+        """Collect the forms on one form-level page opened by _detect_form_levels"""
+        level_url = level_link['full_url']
+        
+        page.wait_for_load_state('domcontentloaded', timeout=60000)
+        self._wait_until_ready(page)
+        
+        # Detect forms on this level
+        forms = page.locator("form").all()
+        input_count = page.locator("input, textarea, select").count()
+        
+        level_data = {
+            'level_number': idx + 1,
+            'level_name': level_link['text'] or f'Level {idx + 1}',
+            'url': level_url,
+            'form_count': len(forms),
+            'input_count': input_count,
+            'forms': []
+        }
+        
+        # First label text for each `for` id, fetched once for the whole page
+        label_map = page.evaluate("""() => {
+            const labels = new Map();
+            for (const label of document.querySelectorAll('label[for]')) {
+                const target = label.getAttribute('for');
+                if (!labels.has(target)) labels.set(target, (label.innerText || '').trim());
+            }
+            return Object.fromEntries(labels);
+        }""")
+        
+        # Analyze each form on this level
+        for form_idx, form in enumerate(forms):
+            try:
+                form_inputs = self._capped(form.locator("input, textarea, select"), self._MAX_INPUTS)
+                form_attrs = self._read_attrs(form, 'id', 'action', 'method')
+                form_data = {
+                    'form_id': form_attrs['id'] or f"form_{form_idx + 1}",
+                    'action': form_attrs['action'] or "",
+                    'method': form_attrs['method'] or "get",
+                    'input_fields': []
+                }
+                
+                for inp in form_inputs:
+                    try:
+                        attrs = self._read_attrs(inp, 'name', 'id', 'placeholder', 'required', 'type')
+                        tag_name = attrs['tag']
+                        field_data = {
+                            'type': tag_name,
+                            'name': attrs['name'] or attrs['id'] or "",
+                            'id': attrs['id'],
+                            'placeholder': attrs['placeholder'] or "",
+                            'required': attrs['required'] is not None,
+                            'label': ''
+                        }
+                        
+                        # Get label if exists
+                        if attrs['id']:
+                            field_data['label'] = label_map.get(attrs['id'], '')
+                        
+                        if tag_name == 'input':
+                            field_data['input_type'] = attrs['type'] or "text"
+                        elif tag_name == 'select':
+                            field_data['options'] = inp.evaluate(
+                                "el => Array.from(el.options).slice(0, 10).map(opt => opt.text.trim()).filter(Boolean)"
+                            )
+                        
+                        form_data['input_fields'].append(field_data)
+                    except:
+                        continue
+                
+                level_data['forms'].append(form_data)
+            except:
+                continue
+        
+        return level_data
+    
+    def _analyze_table(self, table_info: Dict[str, Any], table_locator) -> Dict[str, Any]:
+        """Run the per-table checks for one scanned table.
+
+        Tables are analysed one after another: sync Playwright objects belong to the
+        thread that created them, so they cannot be handed to a worker pool.
+        """
+        headers = table_info.get('headers', [])
+        
+        # Text around the table, shared by the filter and export checks
+        parent_text = self._table_context_text(table_locator)
+        
+        return {
+            'id': table_info.get('id', ''),
+            'headers': headers,
+            # Row count was already taken by the page scan
+            'row_count': table_info.get('row_count', 0),
+            'type': self._classify_erp_table(tuple(h.lower() for h in headers)),
+            'pagination': self._detect_table_pagination(table_locator),
+            'actions': self._detect_table_actions(table_locator),
+            'has_search': self._has_table_search(table_locator),
+            'has_filter': self._has_table_filter(table_locator, parent_text),
+            'has_export': self._has_table_export(table_locator, parent_text)
+        }
+    
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _classify_erp_table(headers: Tuple[str, ...]) -> str:
+        """Classify table type based on lower-cased headers"""
+        headers_text = " ".join(headers)
+        
+        for table_type, pattern in _TABLE_TYPE_PATTERNS:
+            if pattern.search(headers_text):
+                return table_type
+        return 'generic'
     
     def _detect_table_pagination(self, table_locator) -> Dict[str, Any]:
         """Detect pagination controls"""
@@ -671,24 +1029,12 @@ class SmartTestEngine:
         
         try:
             # Check for pagination elements
-            pagination_selectors = [
-                ".pagination",
-                "[class*='pagination']",
-                "[class*='pager']",
-                ".page-info",
-                "[class*='page']"
-            ]
-            
-            for selector in pagination_selectors:
-                try:
-                    pagination_el = table_locator.locator(f".. {selector}, {selector}").first
-                    if pagination_el.count():
-                        pagination['exists'] = True
-                        pagination['type'] = 'standard'
-                        break
-                except:
-                    continue
-        except:
+            # Controls usually sit next to the table, so search from its parent
+            container = table_locator.locator("xpath=..")
+            if container.locator(_PAGINATION_SELECTOR).first.count():
+                pagination['exists'] = True
+                pagination['type'] = 'standard'
+        except PlaywrightError:
             pass
         
         return pagination
@@ -696,68 +1042,53 @@ class SmartTestEngine:
     def _detect_table_actions(self, table_locator) -> List[str]:
         """Detect action buttons/links in table"""
         actions = []
+        seen = set()
         
         try:
-            action_keywords = ['edit', 'delete', 'view', 'details', 'view', 'action']
-            buttons = table_locator.locator("button, a").all()[:10]
-            
-            for btn in buttons:
-                try:
-                    text = btn.inner_text().strip().lower()
-                    for keyword in action_keywords:
-                        if keyword in text and text not in actions:
-                            actions.append(text)
-                            break
-                except:
-                    continue
-        except:
-            pass
+            # All texts in one round-trip instead of an inner_text() call per button
+            texts = table_locator.locator("button, a").evaluate_all(self._ACTION_TEXTS_JS)
+        except PlaywrightError:
+            return actions
+        
+        for text in texts:
+            if text in seen:
+                continue
+            seen.add(text)
+            if _TABLE_ACTION_RE.search(text):
+                actions.append(text)
         
         return actions
     
     def _has_table_search(self, table_locator) -> bool:
         """Check if table has search functionality"""
         try:
-            search_selectors = [
-                "input[type='search']",
-                "input[placeholder*='search']",
-                "input[placeholder*='Search']",
-                ".search-input",
-                "[class*='search']"
-            ]
-            
-            for selector in search_selectors:
-                if table_locator.locator(f".. {selector}, {selector}").first.count():
-                    return True
-        except:
+            container = table_locator.locator("xpath=..")
+            return bool(container.locator(_TABLE_SEARCH_SELECTOR).first.count())
+        except PlaywrightError:
             pass
         return False
     
-    def _has_table_filter(self, table_locator) -> bool:
-        """Check if table has filter functionality"""
+    def _table_context_text(self, table_locator) -> str:
+        """Lower-cased text of the table's parent, or '' if it can't be read"""
         try:
-            filter_keywords = ['filter', 'Filter', 'FILTER']
-            nearby_elements = table_locator.locator("..").first.inner_text().lower()
-            return any(keyword.lower() in nearby_elements for keyword in filter_keywords)
-        except:
-            pass
-        return False
+            return table_locator.locator("..").first.inner_text().lower()
+        except PlaywrightError:
+            return ""
+    
+    def _has_table_filter(self, table_locator, parent_text: str = None) -> bool:
+        """Check if table has filter functionality"""
+        if parent_text is None:
+            parent_text = self._table_context_text(table_locator)
+        return bool(_TABLE_FILTER_RE.search(parent_text))
     
-    def _has_table_export(self, table_locator) -> bool:
+    def _has_table_export(self, table_locator, parent_text: str = None) -> bool:
         """Check if table has export functionality"""
-        try:
-            export_keywords = ['export', 'Export', 'download', 'Download', 'excel', 'csv', 'pdf']
-            nearby_elements = table_locator.locator("..").first.inner_text().lower()
-            return any(keyword.lower() in nearby_elements for keyword in export_keywords)
-        except:
-            pass
-        return False
+        if parent_text is None:
+            parent_text = self._table_context_text(table_locator)
+        return bool(_TABLE_EXPORT_RE.search(parent_text))
     
     def find_login_fields(self):
         """Intelligently find login fields"""
-        login_keywords = ['username', 'user', 'email', 'login', 'userid', 'user_id', 'usr', 'emailid']
-        password_keywords = ['password', 'pass', 'pwd', 'passwd']
-        
         username_field = None
         password_field = None
         login_button = None
@@ -765,12 +1096,9 @@ class SmartTestEngine:
         # Find username field
         for inp in self.detected_elements['input_fields']:
             if inp['type'] in ['text', 'email']:
-                name_lower = inp['name'].lower()
-                id_lower = (inp['id'] or "").lower()
-                placeholder_lower = inp['placeholder'].lower()
-                
-                if any(keyword in name_lower or keyword in id_lower or keyword in placeholder_lower 
-                       for keyword in login_keywords):
+                # One lower-cased haystack; the separator keeps matches from spanning fields
+                haystack = f"{inp['name']}\x1f{inp['id'] or ''}\x1f{inp['placeholder']}".lower()
+                if _LOGIN_FIELD_RE.search(haystack):
                     username_field = inp
                     break
         
@@ -781,66 +1109,55 @@ class SmartTestEngine:
                 break
         
         # Find login button
-        login_btn_keywords = ['login', 'sign in', 'submit', 'log in', 'signin']
         for btn in self.detected_elements['buttons']:
-            btn_text_lower = btn['text'].lower()
-            if any(keyword in btn_text_lower for keyword in login_btn_keywords):
+            if _LOGIN_BUTTON_RE.search(btn['text'].lower()):
                 login_button = btn
                 break
         
         return username_field, password_field, login_button
     
-    def detect_otp_field(self):
-        """Detect OTP input field on the page"""
-        otp_keywords = ['otp', 'verification', 'verify', 'code', 'pin', '2fa', 'two-factor']
-        
+    def detect_otp_field(self, rescan: bool = False):
+        """Detect OTP input field on the page.
+
+        Uses the inputs found by analyze_website unless rescan is set, which
+        re-reads the live page (needed after a navigation such as a login).
+        """
         try:
-            # Check for input fields with OTP-related attributes
-            inputs = self.page.locator("input").all()
+            if rescan or not self.detected_elements.get('input_fields'):
+                # Every input's attributes and label text in one round-trip
+                inputs = self.page.locator("input").evaluate_all(self._OTP_CANDIDATES_JS)
+            else:
+                inputs = [inp for inp in self.detected_elements['input_fields'] if inp['type'] != 'textarea']
             for inp in inputs:
-                try:
-                    input_id = (inp.get_attribute("id") or "").lower()
-                    input_name = (inp.get_attribute("name") or "").lower()
-                    input_placeholder = (inp.get_attribute("placeholder") or "").lower()
-                    input_type = (inp.get_attribute("type") or "").lower()
-                    input_label = ""
-                    
-                    # Try to find associated label
-                    try:
-                        label = inp.locator("xpath=ancestor::label | preceding-sibling::label").first
-                        if label.count():
-                            input_label = label.inner_text().lower()
-                    except:
-                        pass
-                    
-                    # Check if any OTP keyword matches
-                    combined_text = f"{input_id} {input_name} {input_placeholder} {input_label}"
-                    if any(keyword in combined_text for keyword in otp_keywords):
-                        return {
-                            'id': inp.get_attribute("id"),
-                            'name': inp.get_attribute("name"),
-                            'type': input_type,
-                            'placeholder': inp.get_attribute("placeholder")
-                        }
-                    
-                    # Check for number input types (OTP often uses type="text" or "number")
-                    if input_type in ['text', 'number', 'tel']:
-                        max_length = inp.get_attribute("maxlength")
-                        if max_length and int(max_length) <= 10:  # OTPs are usually short
-                            if any(keyword in combined_text for keyword in otp_keywords):
-                                return {
-                                    'id': inp.get_attribute("id"),
-                                    'name': inp.get_attribute("name"),
-                                    'type': input_type,
-                                    'placeholder': inp.get_attribute("placeholder")
-                                }
-                except:
-                    continue
-        except Exception as e:
+                input_type = (inp['type'] or "").lower()
+                
+                # Check if any OTP keyword matches
+                combined_text = " ".join([
+                    (inp['id'] or "").lower(),
+                    (inp['name'] or "").lower(),
+                    (inp['placeholder'] or "").lower(),
+                    (inp.get('label') or "").lower()
+                ])
+                if _OTP_RE.search(combined_text):
+                    return {
+                        'id': inp['id'],
+                        'name': inp['name'],
+                        'type': input_type,
+                        'placeholder': inp['placeholder']
+                    }
+        except PlaywrightError as e:
             print(f"[WARNING] Error detecting OTP field: {e}")
         
         return None
     
+    def _field_locator(self, field: Dict[str, Any], fallback: str):
+        """Locate a detected field by id, then name, then the fallback selector"""
+        if field.get('id'):
+            return self.page.locator(_css_attr('id', field['id']))
+        if field.get('name'):
+            return self.page.locator("input" + _css_attr('name', field['name']))
+        return self.page.locator(fallback).first
+    
     def perform_login(self, otp_value: str = None, wait_for_otp: bool = False):
         """Perform login automatically with optional OTP support"""
         print("[INFO] Attempting to login...")
@@ -857,24 +1174,14 @@ class SmartTestEngine:
         
         try:
             # Enter username
-            if username_field['id']:
-                username_locator = self.page.locator(f"#{username_field['id']}")
-            elif username_field['name']:
-                username_locator = self.page.locator(f"input[name='{username_field['name']}']")
-            else:
-                username_locator = self.page.locator(f"input[type='{username_field['type']}']").first
+            username_locator = self._field_locator(username_field, f"input[type='{username_field['type']}']")
             
             username_locator.fill(self.login_id)
             print(f"[SUCCESS] Entered username: {self.login_id}")
             self.page.wait_for_timeout(500)
             
             # Enter password
-            if password_field['id']:
-                password_locator = self.page.locator(f"#{password_field['id']}")
-            elif password_field['name']:
-                password_locator = self.page.locator(f"input[name='{password_field['name']}']")
-            else:
-                password_locator = self.page.locator("input[type='password']").first
+            password_locator = self._field_locator(password_field, "input[type='password']")
             
             password_locator.fill(self.password)
             print("[SUCCESS] Entered password")
@@ -882,21 +1189,18 @@ class SmartTestEngine:
             
             # Click login button
             if login_button and login_button['id']:
-                login_locator = self.page.locator(f"#{login_button['id']}")
+                login_locator = self.page.locator(_css_attr('id', login_button['id']))
             elif login_button:
-                try:
-                    login_locator = self.page.locator(f"button:has-text('{login_button['text'][:20]}')").first
-                except:
-                    login_locator = self.page.locator("button[type='submit'], input[type='submit']").first
+                login_locator = self.page.get_by_role("button", name=login_button['text'][:20]).first
             else:
-                login_locator = self.page.locator("button[type='submit'], input[type='submit']").first
+                login_locator = self.page.locator(_SUBMIT_SELECTOR).first
             
             login_locator.click()
             print("[SUCCESS] Clicked login button")
             self.page.wait_for_load_state('networkidle')
             
             # Check for OTP field after login attempt
-            otp_field = self.detect_otp_field()
+            otp_field = self.detect_otp_field(rescan=True)
             if otp_field:
                 print("[INFO] OTP field detected! Handling OTP...")
                 
@@ -905,33 +1209,28 @@ class SmartTestEngine:
                     # Wait up to 60 seconds for OTP field to be filled
                     try:
                         otp_locator = None
-                        if otp_field['id']:
-                            otp_locator = self.page.locator(f"#{otp_field['id']}")
-                        elif otp_field['name']:
-                            otp_locator = self.page.locator(f"input[name='{otp_field['name']}']")
-                        else:
+                        if otp_field['id'] or otp_field['name']:
+                            otp_locator = self._field_locator(otp_field, "input")
+                        elif otp_field.get('placeholder'):
                             # Try to find by placeholder
-                            if otp_field.get('placeholder'):
-                                otp_locator = self.page.locator(f"input[placeholder*='{otp_field['placeholder'][:10]}']").first
+                            otp_locator = self.page.get_by_placeholder(otp_field['placeholder'][:10]).first
                         
                         if otp_locator:
-                            # Wait for OTP field to have a value
-                            self.page.wait_for_timeout(1000)
-                            max_wait = 60  # seconds
-                            waited = 0
-                            while waited < max_wait:
-                                try:
-                                    value = otp_locator.input_value()
-                                    if value and len(value.strip()) >= 4:  # OTP usually at least 4 digits
-                                        print(f"[SUCCESS] OTP entered by user: {value[:2]}**")
-                                        break
-                                except:
-                                    pass
-                                time.sleep(1)
-                                waited += 1
+                            # Wait for OTP field to have a value; the browser watches the
+                            # field so there is no round-trip per poll
+                            try:
+                                self.page.wait_for_function(
+                                    "el => el.value && el.value.trim().length >= 4",  # OTP usually at least 4 digits
+                                    arg=otp_locator.element_handle(),
+                                    polling=100,
+                                    timeout=60000
+                                )
+                                print(f"[SUCCESS] OTP entered by user: {otp_locator.input_value()[:2]}**")
+                            except PlaywrightTimeoutError:
+                                print("[WARNING] No OTP entered within 60 seconds, continuing...")
                             
                             # Click submit/verify button
-                            verify_btn = self.page.locator("button:has-text('verify'), button:has-text('submit'), button[type='submit']").first
+                            verify_btn = self.page.locator(_VERIFY_BUTTON_SELECTOR).first
                             if verify_btn.count():
                                 verify_btn.click()
                                 self.page.wait_for_load_state('networkidle')
@@ -939,18 +1238,12 @@ class SmartTestEngine:
                                 # Try pressing Enter in OTP field
                                 otp_locator.press('Enter')
                                 self.page.wait_for_load_state('networkidle')
-                    except Exception as e:
+                    except PlaywrightError as e:
                         print(f"[WARNING] Error waiting for OTP: {e}")
                 elif otp_value:
                     # Enter provided OTP
                     try:
-                        otp_locator = None
-                        if otp_field['id']:
-                            otp_locator = self.page.locator(f"#{otp_field['id']}")
-                        elif otp_field['name']:
-                            otp_locator = self.page.locator(f"input[name='{otp_field['name']}']")
-                        else:
-                            otp_locator = self.page.locator("input[type='text'], input[type='number']").first
+                        otp_locator = self._field_locator(otp_field, "input[type='text'], input[type='number']")
                         
                         if otp_locator and otp_locator.count():
                             otp_locator.fill(otp_value)
@@ -958,28 +1251,27 @@ class SmartTestEngine:
                             self.page.wait_for_timeout(500)
                             
                             # Click submit/verify button
-                            verify_btn = self.page.locator("button:has-text('verify'), button:has-text('submit'), button[type='submit']").first
+                            verify_btn = self.page.locator(_VERIFY_BUTTON_SELECTOR).first
                             if verify_btn.count():
                                 verify_btn.click()
                                 self.page.wait_for_load_state('networkidle')
                             else:
                                 otp_locator.press('Enter')
                                 self.page.wait_for_load_state('networkidle')
-                    except Exception as e:
+                    except PlaywrightError as e:
                         print(f"[ERROR] Error entering OTP: {e}")
                         return False
             
             # Check if login successful
             current_url = self.page.url
-            page_source = self.page.content().lower()
+            page_source = self.page.content()
             
-            if current_url != self.website_url or 'dashboard' in page_source or 'welcome' in page_source or 'home' in page_source:
+            if current_url != self.website_url or _LOGIN_SUCCESS_RE.search(page_source):
                 print(f"[SUCCESS] Login appears successful! Current URL: {current_url}")
                 return True
             else:
                 # Check for error messages
-                error_indicators = ['error', 'invalid', 'incorrect', 'failed']
-                if any(indicator in page_source for indicator in error_indicators):
+                if _LOGIN_ERROR_RE.search(page_source):
                     print("[WARNING] Login may have failed - error indicators found")
                     return False
                 else:
@@ -1065,85 +1357,27 @@ class SmartTestEngine:
         print("[INFO] Generating negative test cases...")
         
         # Login negative tests
-        negative_scenarios = [
-            {
-                'test_id': 'NEG_LOGIN_001',
-                'test_name': 'Login with empty username',
-                'description': 'Verify error message when username is empty',
-                'steps': [
-                    'Navigate to login page',
-                    'Leave username field empty',
-                    'Enter password',
-                    'Click login button'
-                ],
-                'expected_result': 'Error message should be displayed',
-                'priority': 'High'
-            },
-            {
-                'test_id': 'NEG_LOGIN_002',
-                'test_name': 'Login with empty password',
-                'description': 'Verify error message when password is empty',
-                'steps': [
-                    'Navigate to login page',
-                    'Enter username',
-                    'Leave password field empty',
-                    'Click login button'
-                ],
-                'expected_result': 'Error message should be displayed',
-                'priority': 'High'
-            },
-            {
-                'test_id': 'NEG_LOGIN_003',
-                'test_name': 'Login with invalid credentials',
-                'description': 'Verify error message for invalid credentials',
-                'steps': [
-                    'Navigate to login page',
-                    'Enter invalid username: invalid_user',
-                    'Enter invalid password: invalid_pass',
-                    'Click login button'
-                ],
-                'expected_result': 'Invalid credentials error should be displayed',
-                'priority': 'High'
-            },
-            {
-                'test_id': 'NEG_LOGIN_004',
-                'test_name': 'Login with SQL injection attempt',
-                'description': 'Verify system handles SQL injection attempts',
-                'steps': [
-                    'Navigate to login page',
-                    'Enter username: admin\' OR \'1\'=\'1',
-                    'Enter password: test',
-                    'Click login button'
-                ],
-                'expected_result': 'SQL injection should be blocked',
-                'priority': 'Critical'
-            },
-            {
-                'test_id': 'NEG_LOGIN_005',
-                'test_name': 'Login with XSS attempt',
-                'description': 'Verify system handles XSS attacks',
-                'steps': [
-                    'Navigate to login page',
-                    'Enter username: <script>alert("XSS")</script>',
-                    'Enter password: test',
-                    'Click login button'
-                ],
-                'expected_result': 'XSS attack should be prevented',
-                'priority': 'Critical'
-            }
-        ]
-        
-        self.test_cases['negative'].extend(negative_scenarios)
+        self.test_cases['negative'].extend(
+            {**scenario, 'steps': list(scenario['steps'])} for scenario in _LOGIN_NEGATIVE_SCENARIOS
+        )
         
-        # Input field negative tests
+        # One pass over the inputs; security cases are collected separately so
+        # they still follow all the per-field cases
+        field_tests = []
+        security_tests = []
+        security_count = 0
         for inp in self.detected_elements['input_fields']:
+            name = inp['name']
+            key = name.replace(' ', '_')
+            
+            # Input field negative tests
             if inp['required']:
-                self.test_cases['negative'].append({
-                    'test_id': f"NEG_INPUT_{inp['name'].replace(' ', '_')}_EMPTY",
-                    'test_name': f"Empty {inp['name']} field test",
-                    'description': f'Verify {inp["name"]} field validation for empty input',
+                field_tests.append({
+                    'test_id': f"NEG_INPUT_{key}_EMPTY",
+                    'test_name': f"Empty {name} field test",
+                    'description': f'Verify {name} field validation for empty input',
                     'steps': [
-                        f"Leave {inp['name']} field empty",
+                        f"Leave {name} field empty",
                         'Submit form',
                         'Verify validation error'
                     ],
@@ -1153,48 +1387,44 @@ class SmartTestEngine:
             
             # Boundary value tests
             if inp['type'] in ['text', 'number', 'email']:
-                self.test_cases['negative'].append({
-                    'test_id': f"NEG_INPUT_{inp['name'].replace(' ', '_')}_BOUNDARY",
-                    'test_name': f"Boundary value test for {inp['name']}",
-                    'description': f'Test {inp["name"]} with boundary values',
+                field_tests.append({
+                    'test_id': f"NEG_INPUT_{key}_BOUNDARY",
+                    'test_name': f"Boundary value test for {name}",
+                    'description': f'Test {name} with boundary values',
                     'steps': [
-                        f"Enter very long text in {inp['name']} field",
+                        f"Enter very long text in {name} field",
                         'Submit form',
                         'Verify validation'
                     ],
                     'expected_result': 'Field should handle boundary values correctly',
                     'priority': 'Medium'
                 })
+            
+            # Security payload tests for the first 10 text inputs
+            if security_count < 10 and inp['type'] in ['text', 'email', 'search', 'textarea', 'url']:
+                security_count += 1
+                label = name or inp['id'] or "field"
+                sanitized = self._sanitize_identifier(label)
+                for suffix, description, payload in _SECURITY_PAYLOADS:
+                    security_tests.append({
+                        'test_id': f"NEG_SECURITY_{sanitized}_{suffix}",
+                        'test_name': f"{description} in {label}",
+                        'description': f'Test how {label} handles {description.lower()} payloads',
+                        'steps': [
+                            f"Locate field: {label}",
+                            f"Enter payload: {payload}",
+                            'Submit the enclosing form or action',
+                            'Observe application response'
+                        ],
+                        'expected_result': 'Application should reject or sanitize the malicious payload',
+                        'priority': 'Critical',
+                        'field': name,
+                        'field_id': inp['id'],
+                        'malicious_payload': payload
+                    })
         
-        # Security payload tests for text inputs
-        security_inputs = [
-            inp for inp in self.detected_elements['input_fields']
-            if inp['type'] in ['text', 'email', 'search', 'textarea', 'url']
-        ]
-        payloads = [
-            ('SQLI', "SQL injection attempt", "admin' OR '1'='1"),
-            ('XSS', "XSS script injection", '<script>alert(\"XSS\")</script>')
-        ]
-        for inp in security_inputs[:10]:
-            label = inp['name'] or inp['id'] or "field"
-            sanitized = self._sanitize_identifier(label)
-            for suffix, description, payload in payloads:
-                self.test_cases['negative'].append({
-                    'test_id': f"NEG_SECURITY_{sanitized}_{suffix}",
-                    'test_name': f"{description} in {label}",
-                    'description': f'Test how {label} handles {description.lower()} payloads',
-                    'steps': [
-                        f"Locate field: {label}",
-                        f"Enter payload: {payload}",
-                        'Submit the enclosing form or action',
-                        'Observe application response'
-                    ],
-                    'expected_result': 'Application should reject or sanitize the malicious payload',
-                    'priority': 'Critical',
-                    'field': inp['name'],
-                    'field_id': inp['id'],
-                    'malicious_payload': payload
-                })
+        self.test_cases['negative'].extend(field_tests)
+        self.test_cases['negative'].extend(security_tests)
         
         print(f"[SUCCESS] Generated {len(self.test_cases['negative'])} negative test cases")
     
@@ -2230,13 +2460,14 @@ class SmartTestEngine:
         return xlsx_file
     
     def close(self):
-        """Close browser"""
+        """Close this engine's context and release the shared browser"""
         try:
             if self.context:
                 self.context.close()
-            if self.browser:
-                self.browser.close()
-            if self.playwright:
-                self.playwright.stop()
         except:
             pass
+        if self._browser_key is not None:
+            _release_shared_browser(self._browser_key)
+            self._browser_key = None
+        self.context = None
+        self.page = None
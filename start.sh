@@ -5,6 +5,12 @@ echo "========================================"
 echo ""
 echo "Starting server..."
 echo ""
-python3 app.py
+if command -v gunicorn >/dev/null 2>&1; then
+    # Recording sessions live in process memory, so keep a single worker and scale with threads.
+    gunicorn -k gthread --workers "${WEB_WORKERS:-1}" --threads "${WEB_THREADS:-8}" \
+        --timeout 0 --bind 0.0.0.0:5000 wsgi:application
+else
+    python3 app.py
+fi
 
 
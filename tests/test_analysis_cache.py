@@ -0,0 +1,64 @@
+import pytest
+
+pytest.importorskip('playwright')
+
+import app as app_module
+import smart_test_engine
+from smart_test_engine import SmartTestEngine
+
+KEY = ('https://erp.example', '')
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    SmartTestEngine.invalidate_cache()
+    yield
+    SmartTestEngine.invalidate_cache()
+
+
+def test_cached_analysis_is_a_private_copy():
+    detected = {'buttons': [{'text': 'Save'}]}
+    SmartTestEngine._store_analysis(KEY, detected)
+    detected['buttons'].append({'text': 'changed after storing'})
+
+    first = SmartTestEngine._cached_analysis(KEY)
+    first['buttons'][0]['text'] = 'mutated by a caller'
+    assert SmartTestEngine._cached_analysis(KEY) == {'buttons': [{'text': 'Save'}]}
+
+
+def test_cached_analysis_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(smart_test_engine.time, 'monotonic', lambda: now[0])
+    SmartTestEngine._store_analysis(KEY, {'page_title': 'Home'})
+
+    now[0] += SmartTestEngine.ANALYSIS_CACHE_TTL
+    assert SmartTestEngine._cached_analysis(KEY) == {'page_title': 'Home'}
+    now[0] += 1
+    assert SmartTestEngine._cached_analysis(KEY) is None
+    assert KEY not in SmartTestEngine._analysis_cache
+
+
+def test_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(SmartTestEngine, 'ANALYSIS_CACHE_SIZE', 2)
+    for url in ('https://a.example', 'https://b.example'):
+        SmartTestEngine._store_analysis((url, ''), {'url': url})
+    SmartTestEngine._cached_analysis(('https://a.example', ''))
+    SmartTestEngine._store_analysis(('https://c.example', ''), {})
+    assert list(SmartTestEngine._analysis_cache) == [('https://a.example', ''), ('https://c.example', '')]
+
+
+def test_refresh_flag_drops_cached_analysis(monkeypatch):
+    SmartTestEngine._store_analysis(KEY, {'page_title': 'stale'})
+    SmartTestEngine._store_analysis(('https://other.example', ''), {'page_title': 'kept'})
+    seen = []
+    monkeypatch.setattr(SmartTestEngine, 'initialize_driver', lambda self: None)
+    monkeypatch.setattr(SmartTestEngine, 'close', lambda self: None)
+    monkeypatch.setattr(SmartTestEngine, 'analyze_website',
+                        lambda self: seen.append(SmartTestEngine._cached_analysis(KEY)) or {})
+    client = app_module.app.test_client()
+
+    client.post('/api/analyze-website', json={'website_url': 'https://erp.example/'})
+    client.post('/api/analyze-website', json={'website_url': 'https://erp.example/', 'refresh': True})
+
+    assert seen == [{'page_title': 'stale'}, None]
+    assert SmartTestEngine._cached_analysis(('https://other.example', '')) == {'page_title': 'kept'}
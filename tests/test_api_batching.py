@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from api_test_executor import ApiTestExecutor
+from conftest import QuietHandler
+
+
+class _BatchHandler(QuietHandler):
+    replies = []
+    envelopes = []
+    individual = []
+
+    def _send(self, status, body=b''):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_OPTIONS(self):
+        self._send(200 if self.path == '/batch' else 404)
+
+    def do_POST(self):
+        envelope = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        type(self).envelopes.append(envelope)
+        self._send(200, json.dumps(type(self).replies).encode('utf-8'))
+
+    def do_GET(self):
+        type(self).individual.append(self.path)
+        self._send(200, b'{"individual": true}')
+
+
+@pytest.fixture
+def server(http_server):
+    _BatchHandler.envelopes = []
+    _BatchHandler.individual = []
+    return http_server(_BatchHandler)
+
+
+def _run(base_url, paths):
+    executor = ApiTestExecutor(base_url, max_workers=2)
+    cases = [{'test_id': path, 'method': 'GET', 'path': path, 'expected_status': 200} for path in paths]
+    try:
+        return executor.execute_tests(cases, batching=True)['tests']
+    finally:
+        executor.close()
+
+
+def test_batch_replies_are_matched_by_id(server):
+    _BatchHandler.replies = [
+        {'id': 1, 'status': 201, 'body': {'created': True}},
+        {'id': 0, 'status': 200, 'body': 'plain text'},
+    ]
+    results = _run(server, ['/a', '/b'])
+
+    assert _BatchHandler.envelopes[0] == [
+        {'id': 0, 'method': 'GET', 'path': '/a', 'query': {}, 'headers': {}, 'payload': None},
+        {'id': 1, 'method': 'GET', 'path': '/b', 'query': {}, 'headers': {}, 'payload': None},
+    ]
+    assert [result['batched'] for result in results] == [True, True]
+    assert results[0]['response_preview'] == 'plain text'
+    assert results[1]['status'] == 'FAIL'
+    assert results[1]['error'] == 'Expected 200 but received 201'
+    assert _BatchHandler.individual == []
+
+
+def test_malformed_replies_fall_back_to_individual_requests(server):
+    _BatchHandler.replies = [
+        {'id': [0], 'status': 200},
+        {'id': {'index': 1}, 'status': 200},
+        {'id': True, 'status': 200},
+        {'id': 2, 'status': 'OK'},
+        {'id': 99, 'status': 200},
+        'not an object',
+        {'id': 0, 'status': 200, 'body': {'n': 1}},
+    ]
+    results = _run(server, ['/a', '/b', '/c'])
+
+    assert results[0]['batched'] is True
+    assert results[0]['response_preview'] == '{"n": 1}'
+    assert [result.get('batched') for result in results[1:]] == [None, None]
+    assert sorted(_BatchHandler.individual) == ['/b', '/c']
+    assert all(result['status'] == 'PASS' for result in results)
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from api_test_executor import ApiTestExecutor
+from conftest import QuietHandler
+
+
+class _CountingHandler(QuietHandler):
+    hits = Counter()
+    # Seconds to hold each response, so duplicate reads overlap on the pool.
+    delay = 0
+    # Drop the connection of the first request without answering.
+    drop_first = False
+    lock = threading.Lock()
+
+    def _reply(self):
+        with type(self).lock:
+            type(self).hits[(self.command, self.path)] += 1
+            first = sum(type(self).hits.values()) == 1
+        time.sleep(type(self).delay)
+        if first and type(self).drop_first:
+            self.close_connection = True
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_DELETE = _reply
+
+
+@pytest.fixture
+def server(http_server):
+    _CountingHandler.hits = Counter()
+    _CountingHandler.delay = 0
+    _CountingHandler.drop_first = False
+    return http_server(_CountingHandler)
+
+
+def _get(path, test_id='T'):
+    return {'test_id': test_id, 'method': 'GET', 'path': path, 'expected_status': 200}
+
+
+def _run(base_url, cases, workers=1, **options):
+    executor = ApiTestExecutor(base_url, max_workers=workers, **options)
+    try:
+        return executor.execute_tests(cases)['tests']
+    finally:
+        executor.close()
+
+
+def test_cache_is_off_by_default(server):
+    results = _run(server, [_get('/items'), _get('/items')])
+    assert _CountingHandler.hits[('GET', '/items')] == 2
+    assert not any(result.get('cached') for result in results)
+
+
+def test_identical_reads_share_a_response_when_enabled(server):
+    results = _run(server, [_get('/items'), _get('/items')], cache_enabled=True)
+    assert _CountingHandler.hits[('GET', '/items')] == 1
+    assert results[1]['cached'] is True
+    assert results[1]['status'] == 'PASS'
+
+
+def test_reads_under_a_written_path_are_never_cached(server):
+    cases = [
+        _get('/items/1'),
+        {'test_id': 'W', 'method': 'DELETE', 'path': '/items', 'expected_status': 200},
+        _get('/items/1'),
+        _get('/other'),
+        _get('/other'),
+    ]
+    results = _run(server, cases, cache_enabled=True)
+    assert _CountingHandler.hits[('GET', '/items/1')] == 2
+    assert _CountingHandler.hits[('GET', '/other')] == 1
+    assert results[4]['cached'] is True
+
+
+def test_cache_does_not_outlive_a_suite(server):
+    executor = ApiTestExecutor(server, max_workers=1, cache_enabled=True)
+    try:
+        executor.execute_tests([_get('/items')])
+        executor.execute_tests([_get('/items')])
+    finally:
+        executor.close()
+    assert _CountingHandler.hits[('GET', '/items')] == 2
+
+
+def test_concurrent_duplicates_share_one_request(server):
+    _CountingHandler.delay = 0.2
+    results = _run(server, [_get('/items', str(n)) for n in range(4)], workers=4, cache_enabled=True)
+
+    assert _CountingHandler.hits[('GET', '/items')] == 1
+    assert sum(bool(result.get('cached')) for result in results) == 3
+    assert all(result['status'] == 'PASS' for result in results)
+
+
+def test_duplicates_fetch_themselves_when_the_shared_request_fails(server):
+    _CountingHandler.delay = 0.2
+    _CountingHandler.drop_first = True
+    results = _run(server, [_get('/items', str(n)) for n in range(4)], workers=4, cache_enabled=True)
+
+    statuses = sorted(result['status'] for result in results)
+    assert statuses == ['FAIL', 'PASS', 'PASS', 'PASS']
+    assert _CountingHandler.hits[('GET', '/items')] == 4
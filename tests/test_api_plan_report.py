@@ -0,0 +1,60 @@
+import json
+import threading
+
+import pytest
+
+import smart_api_engine
+from smart_api_engine import SmartApiEngine
+
+
+def _engine():
+    return SmartApiEngine('http://api.test', json.dumps({'paths': {}}))
+
+
+def test_concurrent_saves_with_the_same_timestamp(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    temp_paths = []
+    real_replace = smart_api_engine.os.replace
+
+    def recording_replace(src, dst):
+        temp_paths.append(src)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(smart_api_engine.os, 'replace', recording_replace)
+    errors = []
+
+    def save():
+        try:
+            _engine().save_report()
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=save) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(set(temp_paths)) == 8
+    assert not list((tmp_path / 'reports').glob('*.tmp'))
+
+
+def test_failed_save_leaves_no_temp_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def failing_replace(src, dst):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(smart_api_engine.os, 'replace', failing_replace)
+    with pytest.raises(OSError):
+        _engine().save_report()
+    assert list((tmp_path / 'reports').iterdir()) == []
+
+
+def test_saved_plan_gets_the_default_file_mode(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    report_file = _engine().save_report()
+
+    mode = (tmp_path / 'reports' / report_file).stat().st_mode & 0o777
+    assert mode == smart_api_engine.REPORT_FILE_MODE
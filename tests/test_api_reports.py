@@ -0,0 +1,88 @@
+import gzip
+import json
+import os
+import threading
+
+import pytest
+
+import api_test_executor
+from api_test_executor import ApiTestExecutor
+
+
+def _drain_writer():
+    # The writer has one worker, so a no-op task finishes after every earlier write.
+    api_test_executor._report_writer.submit(lambda: None).result()
+
+
+@pytest.fixture
+def reports_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(api_test_executor, 'REPORTS_DIR', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def executor():
+    executor = ApiTestExecutor('http://api.test')
+    executor.summary['total'] = 1
+    executor.results = [{'test_id': 'T1', 'status': 'PASS'}]
+    yield executor
+    executor.close()
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_report_is_swapped_in_whole(reports_dir, executor, monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(api_test_executor, 'orjson', None)
+    report_file = executor.save_execution_report()
+    _drain_writer()
+
+    assert os.listdir(reports_dir) == [report_file]
+    with gzip.open(reports_dir / report_file, 'rb') as handle:
+        report = json.loads(handle.read())
+    assert report['summary']['total'] == 1
+    assert report['results'] == [{'test_id': 'T1', 'status': 'PASS'}]
+
+
+def test_failed_write_is_logged_and_leaves_nothing(reports_dir, executor, monkeypatch, capsys):
+    def broken_dump(*args, **kwargs):
+        raise TypeError('not serializable')
+
+    monkeypatch.setattr(api_test_executor, 'orjson', None)
+    monkeypatch.setattr(api_test_executor.json, 'dump', broken_dump)
+    report_file = executor.save_execution_report()
+    _drain_writer()
+
+    assert os.listdir(reports_dir) == []
+    assert f"[ERROR] Failed to write API execution report {os.path.join(str(reports_dir), report_file)}" \
+        in capsys.readouterr().out
+
+
+def test_report_gets_the_default_file_mode(reports_dir, executor):
+    report_file = executor.save_execution_report()
+    _drain_writer()
+
+    assert os.stat(reports_dir / report_file).st_mode & 0o777 == api_test_executor.REPORT_FILE_MODE
+
+
+def test_download_waits_for_a_pending_write(tmp_path, executor, monkeypatch):
+    import app as app_module
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app_module.app, 'root_path', str(tmp_path))
+    monkeypatch.setattr(api_test_executor, 'REPORTS_DIR', 'reports')
+    os.makedirs('reports')
+    release = threading.Event()
+    real_write = api_test_executor._write_report
+
+    def slow_write(*args):
+        release.wait(5)
+        real_write(*args)
+
+    monkeypatch.setattr(api_test_executor, '_write_report', slow_write)
+    report_file = executor.save_execution_report()
+    threading.Timer(0.2, release.set).start()
+
+    response = app_module.app.test_client().get(f'/api/download-report/{report_file}')
+    assert response.status_code == 200
+    assert json.loads(response.get_data())['summary']['total'] == 1
+    assert api_test_executor._pending_reports == {}
@@ -0,0 +1,35 @@
+import pytest
+
+import app as app_module
+
+
+@pytest.mark.parametrize('max_workers', ['many', [4], {'n': 4}, '2.5', True, False, 3.7])
+def test_execute_rejects_non_numeric_max_workers(max_workers):
+    response = app_module.app.test_client().post('/api/api-tests/execute', json={
+        'base_url': 'http://api.test',
+        'test_cases': [{'method': 'GET', 'path': '/'}],
+        'max_workers': max_workers,
+    })
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'max_workers must be a whole number'}
+
+
+@pytest.mark.parametrize('max_workers, expected', [
+    (None, 32), (0, 1), (-5, 1), (8, 8), (8.0, 8), ('8', 8), (10 ** 6, app_module.MAX_API_WORKERS),
+])
+def test_execute_clamps_max_workers(max_workers, expected, monkeypatch):
+    import api_test_executor
+
+    sizes = []
+
+    class RecordingExecutor(api_test_executor.ApiTestExecutor):
+        def __init__(self, *args, **kwargs):
+            sizes.append(kwargs['max_workers'])
+            raise RuntimeError('stop before running')
+
+    monkeypatch.setattr(api_test_executor, 'ApiTestExecutor', RecordingExecutor)
+    body = {'base_url': 'http://api.test', 'test_cases': [{'method': 'GET', 'path': '/'}]}
+    if max_workers is not None:
+        body['max_workers'] = max_workers
+    app_module.app.test_client().post('/api/api-tests/execute', json=body)
+    assert sizes == [expected]
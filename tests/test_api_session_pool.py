@@ -0,0 +1,142 @@
+import pytest
+
+import api_test_executor
+import app as app_module
+from conftest import QuietHandler
+
+
+@pytest.fixture(autouse=True)
+def empty_pools():
+    app_module.close_api_sessions()
+    yield
+    app_module.close_api_sessions()
+
+
+@pytest.fixture
+def closed_adapters(monkeypatch):
+    closed = []
+    real_build_adapter = api_test_executor.build_adapter
+
+    def build_adapter(*args, **kwargs):
+        adapter = real_build_adapter(*args, **kwargs)
+        real_close = adapter.close
+
+        def close():
+            closed.append(adapter)
+            real_close()
+
+        adapter.close = close
+        return adapter
+
+    monkeypatch.setattr(api_test_executor, 'build_adapter', build_adapter)
+    return closed
+
+
+def test_runs_share_sockets_but_not_cookies():
+    with app_module.lease_api_session('http://api.test/') as first:
+        first.cookies.set('session', 'user-a')
+        with app_module.lease_api_session('http://api.test') as second:
+            assert second.get_adapter('http://api.test/') is first.get_adapter('http://api.test/')
+            assert 'session' not in second.cookies
+    with app_module.lease_api_session('http://api.test') as later:
+        assert not later.cookies
+
+
+def test_reset_waits_for_running_suite(closed_adapters):
+    with app_module.lease_api_session('http://api.test') as session:
+        adapter = session.get_adapter('http://api.test/')
+        assert app_module.close_api_sessions() == 1
+        assert closed_adapters == []
+    assert closed_adapters == [adapter]
+
+
+def test_eviction_skips_pools_in_use(closed_adapters, monkeypatch):
+    monkeypatch.setattr(app_module, 'API_SESSION_CACHE_SIZE', 1)
+    with app_module.lease_api_session('http://one.test') as busy:
+        busy_adapter = busy.get_adapter('http://one.test/')
+        with app_module.lease_api_session('http://two.test') as idle:
+            idle_adapter = idle.get_adapter('http://two.test/')
+        assert closed_adapters == []
+        with app_module.lease_api_session('http://three.test'):
+            assert closed_adapters == [idle_adapter]
+    assert closed_adapters == [idle_adapter, busy_adapter]
+
+
+class _AuthHandler(QuietHandler):
+    def do_GET(self):
+        if self.path == '/login':
+            self.send_response(200)
+            self.send_header('Set-Cookie', 'session=secret; Path=/')
+        else:
+            authorised = 'session=secret' in (self.headers.get('Cookie') or '')
+            self.send_response(200 if authorised else 401)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+@pytest.fixture
+def auth_server(http_server):
+    return http_server(_AuthHandler)
+
+
+def test_later_suite_does_not_send_earlier_cookies(auth_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(api_test_executor, 'REPORTS_DIR', str(tmp_path))
+    monkeypatch.setattr(app_module, 'log_history_entry', lambda entry: None)
+    client = app_module.app.test_client()
+
+    def run(path, expected_status):
+        response = client.post('/api/api-tests/execute', json={
+            'base_url': auth_server,
+            'test_cases': [{'test_id': path, 'method': 'GET', 'path': path, 'expected_status': expected_status}],
+        })
+        return response.get_json()['results']['tests'][0]
+
+    assert run('/login', 200)['status'] == 'PASS'
+    anonymous = run('/me', 401)
+    assert anonymous['status_code'] == 401
+    assert anonymous['status'] == 'PASS'
+
+
+def test_executor_sizes_its_own_pool_and_leaves_shared_sessions_open(closed_adapters):
+    executor = api_test_executor.ApiTestExecutor('http://api.test', max_workers=12)
+    own_adapter = executor.session.get_adapter('http://api.test/')
+    assert own_adapter._pool_maxsize == 12
+    executor.close()
+    # Session.close() closes the adapter once per mounted scheme.
+    assert set(closed_adapters) == {own_adapter}
+
+    closed_adapters.clear()
+    with app_module.lease_api_session('http://api.test') as session:
+        shared = api_test_executor.ApiTestExecutor('http://api.test', session=session)
+        shared.close()
+        assert closed_adapters == []
+
+
+class _SizedBodyHandler(QuietHandler):
+    # Keep-alive, so reuse shows up as several requests on one client port.
+    protocol_version = 'HTTP/1.1'
+    client_ports = set()
+
+    def do_GET(self):
+        type(self).client_ports.add(self.client_address[1])
+        body = b'x' * int(self.path.lstrip('/'))
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.mark.parametrize('size, connections', [(10, 1), (5000, 1), (api_test_executor.DRAIN_LIMIT * 2, 10)])
+def test_bounded_bodies_keep_the_pooled_connection(http_server, size, connections):
+    _SizedBodyHandler.client_ports = set()
+    base_url = http_server(_SizedBodyHandler)
+    executor = api_test_executor.ApiTestExecutor(base_url, max_workers=1)
+    cases = [{'test_id': str(run), 'method': 'GET', 'path': f'/{size}', 'expected_status': 200} for run in range(10)]
+    try:
+        results = executor.execute_tests(cases)['tests']
+    finally:
+        executor.close()
+
+    assert all(result['status'] == 'PASS' for result in results)
+    assert len(results[0]['response_preview']) == min(size, api_test_executor.PREVIEW_LIMIT + 3)
+    assert len(_SizedBodyHandler.client_ports) == connections
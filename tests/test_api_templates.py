@@ -0,0 +1,58 @@
+import pytest
+
+from api_test_executor import ApiTestExecutor
+from conftest import QuietHandler
+
+
+class _EchoHandler(QuietHandler):
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append((self.path, self.headers.get('Cookie')))
+        self.send_response(200)
+        if self.path == '/login':
+            self.send_header('Set-Cookie', 'session=abc; Path=/')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+@pytest.fixture
+def server(http_server):
+    _EchoHandler.requests = []
+    return http_server(_EchoHandler)
+
+
+def _run(base_url, cases):
+    # One worker keeps the cases in order, so /login answers before the rest run.
+    executor = ApiTestExecutor(base_url, max_workers=1)
+    try:
+        return executor.execute_tests(cases)['tests']
+    finally:
+        executor.close()
+
+
+def test_templated_requests_send_cookies_set_earlier_in_the_suite(server):
+    cases = [
+        {'method': 'GET', 'path': '/login'},
+        {'method': 'GET', 'path': '/me'},
+        {'method': 'GET', 'path': '/me'},
+    ]
+    _run(server, cases)
+    assert _EchoHandler.requests == [('/login', None), ('/me', 'session=abc'), ('/me', 'session=abc')]
+
+
+def test_cases_that_cannot_be_templated_still_run(server):
+    cases = [
+        {'method': 'GET', 'path': '/search', 'query': {'ids': [1, 2]}},
+        {'method': 'GET', 'path': '/me', 'headers': {'cookie': 'session=own'}},
+    ]
+    results = _run(server, cases)
+    assert [result['status'] for result in results] == ['PASS', 'PASS']
+    assert _EchoHandler.requests == [('/search?ids=1&ids=2', None), ('/me', 'session=own')]
+
+
+def test_template_key():
+    key = ApiTestExecutor._template_key('GET', 'http://api.test/a', {'B': '2', 'A': '1'}, {'q': 'x'})
+    assert key == ('GET', 'http://api.test/a', (('A', '1'), ('B', '2')), (('q', 'x'),))
+    assert ApiTestExecutor._template_key('GET', 'http://api.test/a', {}, {'ids': [1]}) is None
+    assert ApiTestExecutor._template_key('GET', 'http://api.test/a', {'Cookie': 'a=b'}, {}) is None
@@ -0,0 +1,52 @@
+import json
+from datetime import datetime
+
+import pytest
+from flask import jsonify
+
+import app as app_module
+
+orjson = pytest.importorskip('orjson')
+
+
+@pytest.fixture
+def orjson_calls(monkeypatch):
+    calls = []
+    real_dumps = orjson.dumps
+
+    def spy(*args, **kwargs):
+        calls.append(kwargs.get('option'))
+        return real_dumps(*args, **kwargs)
+
+    monkeypatch.setattr(app_module.orjson, 'dumps', spy)
+    return calls
+
+
+def test_jsonify_goes_through_orjson(orjson_calls):
+    with app_module.app.app_context():
+        response = jsonify({'a': 1, 2: 'b'})
+    assert len(orjson_calls) == 1
+    assert json.loads(response.get_data()) == {'a': 1, '2': 'b'}
+
+
+def test_jsonify_debug_indent_uses_orjson(orjson_calls, monkeypatch):
+    monkeypatch.setattr(app_module.app, 'debug', True)
+    with app_module.app.app_context():
+        response = jsonify({'a': [1, 2]})
+    assert len(orjson_calls) == 1
+    assert orjson_calls[0] & orjson.OPT_INDENT_2
+    assert response.get_data(as_text=True) == '{\n  "a": [\n    1,\n    2\n  ]\n}\n'
+
+
+def test_unknown_options_fall_back_to_stdlib(orjson_calls):
+    provider = app_module.app.json
+    assert provider.dumps({'a': 1}, indent=4) == json.dumps({'a': 1}, indent=4)
+    assert provider.dumps({'a': 1}, separators=(', ', ': ')) == '{"a": 1}'
+    assert orjson_calls == []
+
+
+def test_unsupported_types_use_provider_default(orjson_calls):
+    stamp = datetime(2024, 1, 2, 3, 4, 5)
+    encoded = app_module.app.json.dumps({'when': stamp}, separators=(',', ':'))
+    # datetimes keep Flask's HTTP-date format instead of orjson's ISO output.
+    assert json.loads(encoded)['when'] == 'Tue, 02 Jan 2024 03:04:05 GMT'
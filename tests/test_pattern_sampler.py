@@ -0,0 +1,73 @@
+import json
+import re
+
+import pytest
+
+import smart_api_engine
+from smart_api_engine import MAX_PATTERN_SAMPLE_LENGTH, SmartApiEngine, _sample_from_pattern
+
+
+@pytest.mark.parametrize('pattern', [
+    r'^[A-Z]{3}-\d{4}$',
+    r'^\w+@\w+\.com$',
+    r'[^a]',
+    r'[^\W\d]x',
+    r'\S\s\D',
+    r'^.{2,}$',
+    r'[a-f0-9]{8}',
+    r'x+?y*',
+])
+def test_classes_and_repeats(pattern):
+    sample = _sample_from_pattern(pattern)
+    assert sample is not None
+    assert re.search(pattern, sample)
+
+
+def test_groups_and_backreferences():
+    assert _sample_from_pattern(r'(ab)-\1') == 'ab-ab'
+    assert _sample_from_pattern(r'(?P<tag>x{2})=(?P=tag)') == 'xx=xx'
+    assert _sample_from_pattern(r'(?:cd){2}') == 'cdcd'
+
+
+def test_branches_take_the_first_alternative():
+    assert _sample_from_pattern(r'^(?:foo|barbaz)$') == 'foo'
+    assert _sample_from_pattern(r'red|green') == 'red'
+
+
+def test_optional_parts_are_skipped():
+    assert _sample_from_pattern(r'^a(x{1000000})?b$') == 'ab'
+
+
+@pytest.mark.parametrize('pattern', [
+    r'x{1000000}',
+    r'(a{1000}){1000}',
+    r'((ab){100}){100}',
+    'a' * (MAX_PATTERN_SAMPLE_LENGTH + 1),
+])
+def test_samples_are_capped(pattern):
+    assert _sample_from_pattern(pattern) is None
+
+
+def test_cap_boundary_is_inclusive():
+    assert _sample_from_pattern(r'x{%d}' % MAX_PATTERN_SAMPLE_LENGTH) == 'x' * MAX_PATTERN_SAMPLE_LENGTH
+
+
+def test_missing_parser_internals_disable_sampling(monkeypatch):
+    monkeypatch.setattr(smart_api_engine, 'sre_parse', None)
+    assert _sample_from_pattern(r'\d+') is None
+
+
+def test_engine_uses_samples_and_falls_back_for_oversized_patterns():
+    engine = SmartApiEngine('http://api.test', json.dumps({'paths': {}}))
+    # Held in locals: the engine keys its sample cache on id() of spec-owned schemas.
+    simple = {'type': 'string', 'pattern': r'^[A-Z]{2}\d$'}
+    oversized = {'type': 'string', 'pattern': r'x{1000000}'}
+    assert engine._sample_value(simple) == 'AA0'
+    assert engine._sample_value(oversized) == 'sample-text'
+
+
+@pytest.mark.parametrize('pattern', [123, None, ['^a$']])
+def test_engine_ignores_non_string_patterns(pattern):
+    engine = SmartApiEngine('http://api.test', json.dumps({'paths': {}}))
+    schema = {'type': 'string', 'pattern': pattern}
+    assert engine._sample_value(schema) == 'sample-text'
@@ -0,0 +1,51 @@
+import gzip
+import os
+
+import pytest
+
+import app as app_module
+
+REPORT = b'{"summary": {"total": 1}}'
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # download_report checks paths relative to the working directory and
+    # send_file resolves them against the app root; point both at tmp_path.
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app_module.app, 'root_path', str(tmp_path))
+    os.makedirs('reports')
+    with gzip.open(tmp_path / 'reports' / 'api_execution_report_1.json.gz', 'wb') as handle:
+        handle.write(REPORT)
+    (tmp_path / 'reports' / 'plan.json').write_bytes(REPORT)
+    return app_module.app.test_client()
+
+
+def test_gzip_report_is_served_compressed_to_capable_clients(client):
+    response = client.get('/api/download-report/api_execution_report_1.json.gz',
+                          headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert 'api_execution_report_1.json' in response.headers['Content-Disposition']
+    assert gzip.decompress(response.get_data()) == REPORT
+
+
+def test_gzip_report_is_inflated_for_other_clients(client):
+    response = client.get('/api/download-report/api_execution_report_1.json.gz')
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == REPORT
+
+
+def test_plain_report_supports_conditional_requests(client):
+    first = client.get('/api/download-report/plan.json')
+    assert first.get_data() == REPORT
+    repeat = client.get('/api/download-report/plan.json', headers={'If-None-Match': first.headers['ETag']})
+    assert repeat.status_code == 304
+
+
+def test_missing_report_is_404(client):
+    response = client.get('/api/download-report/nope.json.gz')
+    assert response.status_code == 404
+    assert response.get_json() == {'error': 'Report not found'}
@@ -0,0 +1,91 @@
+import json
+import os
+
+import pytest
+
+import report_history
+
+
+@pytest.fixture(autouse=True)
+def history_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('reports')
+    monkeypatch.setattr(report_history, '_line_count', None)
+    monkeypatch.setattr(report_history, '_cache', None)
+    monkeypatch.setattr(report_history, '_cache_stamp', None)
+    return tmp_path / 'reports'
+
+
+def _log_lines(history_dir):
+    return (history_dir / 'run_history.jsonl').read_text(encoding='utf-8').splitlines()
+
+
+def test_entries_come_back_newest_first(history_dir):
+    for run in range(3):
+        report_history.add_entry({'run': run})
+
+    assert [entry['run'] for entry in report_history.get_history()] == [2, 1, 0]
+    assert [entry['run'] for entry in report_history.get_history(limit=2)] == [2, 1]
+    assert report_history.get_history(limit=-5) == []
+    assert all('timestamp' in entry for entry in report_history.get_history())
+    # The log itself is append-only, oldest first.
+    assert [json.loads(line)['run'] for line in _log_lines(history_dir)] == [0, 1, 2]
+
+
+def test_history_is_capped_at_max_entries():
+    for run in range(report_history.MAX_ENTRIES + 5):
+        report_history.add_entry({'run': run})
+
+    history = report_history.get_history(limit=1000)
+    assert len(history) == report_history.MAX_ENTRIES
+    assert history[0]['run'] == report_history.MAX_ENTRIES + 4
+
+
+def test_log_is_compacted_past_the_threshold(history_dir, monkeypatch):
+    monkeypatch.setattr(report_history, 'COMPACT_THRESHOLD', 30)
+    for run in range(31):
+        report_history.add_entry({'run': run})
+
+    lines = _log_lines(history_dir)
+    assert len(lines) == report_history.MAX_ENTRIES
+    assert json.loads(lines[-1])['run'] == 30
+    assert report_history.get_history()[0]['run'] == 30
+
+
+def test_legacy_json_list_is_migrated(history_dir):
+    legacy = [{'run': 'newest'}, {'run': 'older'}, {'run': 'oldest'}]
+    (history_dir / 'run_history.json').write_text(json.dumps(legacy), encoding='utf-8')
+
+    assert [entry['run'] for entry in report_history.get_history()] == ['newest', 'older', 'oldest']
+    assert not (history_dir / 'run_history.json').exists()
+    assert [json.loads(line)['run'] for line in _log_lines(history_dir)] == ['oldest', 'older', 'newest']
+
+
+def test_unreadable_legacy_file_is_quarantined(history_dir, capsys):
+    (history_dir / 'run_history.json').write_text('{not json', encoding='utf-8')
+
+    assert report_history.get_history() == []
+    assert not (history_dir / 'run_history.json').exists()
+    assert len(list(history_dir.glob('run_history.corrupt.*.json'))) == 1
+    assert 'Moved unreadable run history' in capsys.readouterr().out
+
+
+def test_unreadable_lines_are_skipped(history_dir):
+    report_history.add_entry({'run': 1})
+    with open(history_dir / 'run_history.jsonl', 'ab') as handle:
+        handle.write(b'{truncated\n')
+    report_history.add_entry({'run': 2})
+    # Drop the in-process cache so the log is read back from disk.
+    report_history._cache = None
+
+    assert [entry['run'] for entry in report_history.get_history()] == [2, 1]
+
+
+def test_appends_from_another_process_are_picked_up(history_dir):
+    report_history.add_entry({'run': 1})
+    assert len(report_history.get_history()) == 1
+
+    with open(history_dir / 'run_history.jsonl', 'ab') as handle:
+        handle.write(b'{"run": "other process", "padding": "changes the file size"}\n')
+
+    assert report_history.get_history()[0]['run'] == 'other process'
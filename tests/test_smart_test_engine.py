@@ -0,0 +1,84 @@
+import pytest
+
+pytest.importorskip('playwright')
+
+from smart_test_engine import SmartTestEngine, _css_attr
+
+
+@pytest.fixture
+def engine():
+    return SmartTestEngine('https://erp.example', 'admin', 'secret')
+
+
+@pytest.mark.parametrize('headers, expected', [
+    (('roll no', 'name'), 'student_list'),
+    (('amount', 'due date'), 'fee_record'),
+    (('date', 'present'), 'attendance'),
+    (('subject', 'marks'), 'examination'),
+    (('student', 'fee'), 'student_list'),
+    (('code', 'value'), 'generic'),
+    ((), 'generic'),
+])
+def test_classify_erp_table(headers, expected):
+    assert SmartTestEngine._classify_erp_table(headers) == expected
+
+
+@pytest.mark.parametrize('element_class, text, expected', [
+    ('card chart-box', 'Enrolment', 'chart'),
+    ('card', 'Total students 120', 'statistics'),
+    ('data-table', 'Recent fees', 'table'),
+    ('todo-list', 'Pending tasks', 'list'),
+    ('panel', 'Welcome back', 'card'),
+])
+def test_classify_widget_type(element_class, text, expected):
+    assert SmartTestEngine._classify_widget_type(element_class, text) == expected
+
+
+def test_css_attr_quotes_page_values():
+    assert _css_attr('id', 'plain') == '[id="plain"]'
+    assert _css_attr('name', 'a"b\\c\nd') == '[name="a\\"b\\\\c\\a d"]'
+
+
+def test_detect_erp_modules_from_nav_links(engine):
+    nav_links = [
+        {'text': 'Student Attendance', 'href': '/attendance', 'id': 'nav-1'},
+        {'text': 'Fee Payment', 'href': '/fees', 'id': None},
+        {'text': 'X', 'href': '/x', 'id': None},
+        {'text': 'Settings', 'href': '/settings', 'id': None},
+    ]
+    modules = {module['name']: module for module in engine.detect_erp_modules(nav_links)}
+
+    assert set(modules) == {'Student', 'Attendance', 'Finance'}
+    assert modules['Student']['links'] == [{'text': 'student attendance', 'href': '/attendance', 'id': 'nav-1'}]
+    assert modules['Finance']['count'] == 1
+
+
+def test_detect_dashboard_widgets_skips_short_and_duplicate_elements(engine):
+    widgets = engine.detect_dashboard_widgets([
+        {'id': 'w1', 'cls': 'stat-card', 'text': 'Total Students 1200'},
+        {'id': 'w1', 'cls': 'stat-card', 'text': 'Total Students 1200'},
+        {'id': '', 'cls': 'card', 'text': 'Hi'},
+        {'id': None, 'cls': None, 'text': 'Announcements for this week'},
+    ])
+    assert widgets == [
+        {'id': 'w1', 'class': 'stat-card', 'title': 'Total Students 1200', 'type': 'statistics'},
+        {'id': 'widget_2', 'class': '', 'title': 'Announcements for this week', 'type': 'card'},
+    ]
+
+
+def test_find_login_fields(engine):
+    engine.detected_elements = {
+        'input_fields': [
+            {'type': 'text', 'name': 'search', 'id': 'q', 'placeholder': 'Search'},
+            {'type': 'email', 'name': 'email', 'id': None, 'placeholder': ''},
+            {'type': 'password', 'name': 'pwd', 'id': 'pwd', 'placeholder': ''},
+        ],
+        'buttons': [
+            {'text': 'Cancel', 'id': ''},
+            {'text': 'Sign In', 'id': 'go'},
+        ],
+    }
+    username, password, button = engine.find_login_fields()
+    assert username['name'] == 'email'
+    assert password['id'] == 'pwd'
+    assert button['id'] == 'go'
@@ -0,0 +1,9 @@
+"""
+WSGI entry point for production servers.
+
+    gunicorn -k gthread --workers 1 --threads 8 --bind 0.0.0.0:5000 wsgi:application
+"""
+
+from app import app
+
+application = app